@@ -0,0 +1,160 @@
+# cli.py
+# 不依赖界面的命令行入口，例如：python -m app.cli process data/ -o out/
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from app.models.baseline_configs import BaselineMethod
+from app.services.processing import Operation, process_path, validate_steps
+from app.services.text_parser import SUPPORTED_SUFFIXES
+
+PEAKS_CSV = "peaks.csv"
+
+
+def find_data_files(folder: Path, recursive: bool = False) -> list[Path]:
+    """
+    列出目录中所有支持格式的数据文件，按路径排序。
+    """
+    pattern = "**/*" if recursive else "*"
+    return sorted(p for p in folder.glob(pattern)
+                  if p.is_file() and p.suffix.lower() in SUPPORTED_SUFFIXES)
+
+
+def build_steps(args, parser: argparse.ArgumentParser) -> list[dict]:
+    """
+    由命令行参数组成处理步骤（见 processing.validate_steps）。
+
+    --steps 不是合法的 JSON 或步骤无效时经 parser.error 退出。
+    """
+    if args.steps:
+        try:
+            return validate_steps(json.loads(args.steps))
+        except ValueError as e:
+            # json.JSONDecodeError 也是 ValueError
+            parser.error(f"argument --steps: {e}")
+    steps = []
+    if args.baseline != "none":
+        steps.append({"op": Operation.BASELINE, "method": args.baseline})
+    if args.smooth != "none":
+        steps.append({"op": Operation.SMOOTH, "method": args.smooth,
+                      "window": args.window, "poly": args.poly})
+    if not args.no_peaks:
+        steps.append({"op": Operation.PEAKS, "snr": args.snr})
+    try:
+        return validate_steps(steps)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+def _write_peaks(path: Path, tables: list[tuple[str, dict]]):
+    """
+    把各文件的峰表合并写入一个 CSV，curve 为曲线在文件中的序号。
+    """
+    columns = ("two_theta", "d_spacing", "height", "width")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("source", "curve") + columns)
+        for source, table in tables:
+            rows = zip(table["curve_id"], *(table[c] for c in columns))
+            writer.writerows((source, *row) for row in rows)
+
+
+def process(args) -> int:
+    """
+    用进程池处理目录下的所有数据文件，结果写入输出目录并打印吞吐量。
+    args.steps 为 build_steps 检查过的处理步骤。
+
+    :return: 进程退出码，有文件失败时为 1
+    """
+    folder = Path(args.folder)
+    files = find_data_files(folder, args.recursive)
+    if not files:
+        print(f"No data files found in {folder}", file=sys.stderr)
+        return 1
+    out_dir = Path(args.output) if args.output else folder / "processed"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    steps = args.steps
+    workers = args.workers or os.cpu_count() or 1
+
+    n_curves = n_points = n_peaks = 0
+    failed = []
+    tables = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers) as executor:
+        futures = {executor.submit(process_path, str(p), steps, str(out_dir)):
+                   p for p in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                summary, _ = future.result()
+            except Exception as e:
+                failed.append(path)
+                print(f"{path}: {e}", file=sys.stderr)
+                continue
+            n_curves += summary["n_curves"]
+            n_points += summary["n_curves"] * summary["n_points"]
+            if summary["peaks"] is not None:
+                n_peaks += len(summary["peaks"]["curve_id"])
+                tables.append((summary["source"], summary["peaks"]))
+            if args.verbose:
+                print(f"{path}: {summary['n_curves']} curves")
+    elapsed = time.perf_counter() - start
+
+    if tables:
+        tables.sort(key=lambda item: item[0])
+        _write_peaks(out_dir / PEAKS_CSV, tables)
+
+    done = len(files) - len(failed)
+    print(f"Processed {done}/{len(files)} files ({n_curves} curves, "
+          f"{n_points} points, {n_peaks} peaks) in {elapsed:.2f} s "
+          f"with {workers} workers")
+    if elapsed > 0:
+        print(f"Throughput: {done / elapsed:.1f} files/s, "
+              f"{n_curves / elapsed:.1f} curves/s, "
+              f"{n_points / elapsed / 1e6:.2f} Mpoints/s")
+    print(f"Results written to {out_dir}")
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser(
+        "process", help="对目录中的每个文件扣背景、平滑并找峰")
+    p.add_argument("folder", help="数据文件所在目录")
+    p.add_argument("-o", "--output",
+                   help="输出目录，默认为 <folder>/processed")
+    p.add_argument("-r", "--recursive", action="store_true",
+                   help="包含子目录中的文件")
+    p.add_argument("-j", "--workers", type=int,
+                   help="进程数，默认为 CPU 核数")
+    p.add_argument("--baseline", default=BaselineMethod.SNIP,
+                   choices=[v for k, v in vars(BaselineMethod).items()
+                            if not k.startswith("_")] + ["none"],
+                   help="背景方法（BaselineMethod 之一），none 表示不扣背景")
+    p.add_argument("--smooth", default="savgol",
+                   choices=("savgol", "median", "none"))
+    p.add_argument("--window", type=int, default=11)
+    p.add_argument("--poly", type=int, default=3)
+    p.add_argument("--no-peaks", action="store_true", help="不找峰")
+    p.add_argument("--snr", type=float, default=8.0,
+                   help="找峰的显著度阈值相对噪声的倍数")
+    p.add_argument("--steps",
+                   help="JSON 格式的处理步骤，指定时忽略上面的步骤参数")
+    p.add_argument("-v", "--verbose", action="store_true")
+    p.set_defaults(func=process)
+
+    args = parser.parse_args(argv)
+    if args.command == "process":
+        args.steps = build_steps(args, p)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
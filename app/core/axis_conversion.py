@@ -0,0 +1,68 @@
+import numpy as np
+
+from app.models.axis_types import XType
+
+# Cu Kα1
+DEFAULT_WAVELENGTH = 1.5406
+
+
+def two_theta_to_d(two_theta, wavelength):
+    """
+    布拉格定律 d = λ / (2 sin θ)。
+    """
+    theta = np.radians(np.asarray(two_theta, dtype=float)) / 2
+    with np.errstate(divide="ignore"):
+        return wavelength / (2 * np.sin(theta))
+
+
+def d_to_two_theta(d, wavelength):
+    """
+    2θ = 2 arcsin(λ / 2d)，λ / 2d > 1 的点无对应角度，返回 NaN。
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = wavelength / (2 * np.asarray(d, dtype=float))
+        return np.degrees(2 * np.arcsin(ratio))
+
+
+def two_theta_to_q(two_theta, wavelength):
+    """
+    Q = 4π sin θ / λ。
+    """
+    theta = np.radians(np.asarray(two_theta, dtype=float)) / 2
+    return 4 * np.pi * np.sin(theta) / wavelength
+
+
+def q_to_two_theta(q, wavelength):
+    with np.errstate(invalid="ignore"):
+        ratio = np.asarray(q, dtype=float) * wavelength / (4 * np.pi)
+        return np.degrees(2 * np.arcsin(ratio))
+
+
+def convert_axis(x, from_type: str, to_type: str, wavelength: float):
+    """
+    在 2θ、d 和 Q 之间转换横坐标，先换算到 2θ 再换算到目标类型。
+
+    :param x: 横坐标数组
+    :param from_type: XType 中的原始类型
+    :param to_type: XType 中的目标类型
+    :param wavelength: 波长（Å）
+    """
+    if from_type == to_type:
+        return np.asarray(x, dtype=float)
+
+    if from_type == XType.TWO_THETA:
+        two_theta = np.asarray(x, dtype=float)
+    elif from_type == XType.D_SPACING:
+        two_theta = d_to_two_theta(x, wavelength)
+    elif from_type == XType.Q:
+        two_theta = q_to_two_theta(x, wavelength)
+    else:
+        raise ValueError(f"Unknown axis type: {from_type}")
+
+    if to_type == XType.TWO_THETA:
+        return two_theta
+    elif to_type == XType.D_SPACING:
+        return two_theta_to_d(two_theta, wavelength)
+    elif to_type == XType.Q:
+        return two_theta_to_q(two_theta, wavelength)
+    raise ValueError(f"Unknown axis type: {to_type}")
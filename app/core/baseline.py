@@ -1,14 +1,53 @@
+from functools import partial
+
 import numpy as np
-from scipy import sparse
-from scipy.interpolate import interp1d
-from scipy.ndimage import minimum_filter1d
-from scipy.signal import find_peaks, medfilt, savgol_filter
-from scipy.sparse import csc_matrix, spdiags
-from scipy.sparse.linalg import spsolve
 
 from app.models.baseline_configs import BaselineMethod
 from app.models.curve import Curve
-from app.services.data_center import ParamKey, data_center
+from app.services.result_cache import cached_result
+
+
+def _second_diff_penalty_band(n, lam):
+    """
+    构建 lam * DᵀD 的上三角带状存储（solveh_banded 格式），D 为二阶差分矩阵。
+
+    DᵀD 是对称五对角矩阵，只需 3 x n 的存储，不会生成稠密矩阵。
+
+    参数:
+        n : int
+            信号长度，至少为3。
+        lam : float
+            平滑参数。
+
+    返回:
+        ab : ndarray, shape (3, n)
+            ab[0] 为第二条上对角线，ab[1] 为第一条上对角线，ab[2] 为主对角线。
+    """
+    if n < 3:
+        raise ValueError("Signal must have at least 3 points")
+    m = n - 2
+    ab = np.zeros((3, n))
+    ab[0, 2:] = 1.0
+    ab[1, 1:m+1] -= 2.0
+    ab[1, 2:] -= 2.0
+    ab[2, :m] += 1.0
+    ab[2, 1:m+1] += 4.0
+    ab[2, 2:] += 1.0
+    ab *= lam
+    return ab
+
+
+def _poly_fit(x, y, degree):
+    """
+    多项式最小二乘拟合，横坐标缩放到 [-1, 1] 后构建 Vandermonde 矩阵，
+    二维 y 的所有行共用该矩阵，通过一次 lstsq 求解。
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    half = (x.max() - x.min()) / 2 or 1.0
+    V = np.vander((x - x.min()) / half - 1, degree + 1)
+    coeff, *_ = np.linalg.lstsq(V, y.T, rcond=None)
+    return (V @ coeff).T
 
 
 class XRDBackground:
@@ -16,6 +55,7 @@ class XRDBackground:
     统一的XRD背景去除工具类，支持多种背景估计算法，并可选地保护峰区域不受影响。
 
     支持的方法包括：SNIP、ALS、多项式拟合、滚动球、改进多项式拟合和锚点插值等。
+    各 baseline_* 和平滑方法的结果按输入内容和参数缓存，见 result_cache。
 
     Unified XRD background removal with optional peak-protection
     """
@@ -24,23 +64,30 @@ class XRDBackground:
         """
         初始化XRDBackground实例。
         """
-        self.data_center = data_center()
+        self._data_center = None
+
+    @property
+    def data_center(self):
+        """
+        全局数据中心，首次使用时才导入。
+        只调用 baseline_* 的场合（命令行、API 工作进程）因此不依赖 Qt。
+        """
+        if self._data_center is None:
+            from app.services.data_center import data_center
+            self._data_center = data_center()
+        return self._data_center
 
     # ------------------ 主入口 ------------------
 
     def compute(self, protect_peak=False,
                 peak_params=None, **params):
         """
-        根据指定方法计算输入数据的背景并进行扣除。
+        对数据中心内的所有曲线计算背景，并写回每条曲线的 baseline。
+
+        共享同一横坐标的曲线（如多列文件拆分出的曲线）会被堆叠为二维数组，
+        通过 baseline_batch 一次性计算。
 
         参数:
-            x : array-like
-                数据横坐标（如角度或能量）。
-            y : array-like
-                数据纵坐标（强度或其他测量值）。
-            method : str, 可选
-                背景估算方法。默认为"snip"。
-                可选项："snip", "als", "poly", "rolling_ball", "modpoly", "anchor"
             protect_peak : bool, 可选
                 是否启用峰保护机制以避免在背景估计中误判峰为背景成分。默认False。
             peak_params : dict, 可选
@@ -49,47 +96,138 @@ class XRDBackground:
                 其他传递给具体背景算法的参数。
 
         返回:
-            tuple:
-                baseline : ndarray
-                    估算出的背景曲线。
-                corrected_y : ndarray
-                    扣除背景后的数据。
-                mask : ndarray or None
-                    若启用了峰保护，则返回峰区域掩码；否则为None。
-        """
-        curve: Curve = next(iter(self.data_center.curves.values()))
+            baselines : dict
+                曲线 id 到背景曲线的映射。
+        """
+        from app.services.data_center import ParamKey
+
+        method = self.data_center.params.get(
+            ParamKey.BASELINE_METHOD, BaselineMethod.SNIP)
+
+        baselines = {}
+        self.data_center.begin_batch()
+        for x, curves in self._group_by_axis(self.data_center.curves.values()):
+            Y = np.stack([np.asarray(c.displayed_y, dtype=float)
+                          for c in curves])
+            batch = self.baseline_batch(x, Y, method, protect_peak,
+                                        peak_params, **params)
+            baselines.update(self._store_baselines(curves, batch))
+        self.data_center.end_batch()
+        return baselines
+
+    def compute_async(self, service, protect_peak=False,
+                      peak_params=None, **params):
+        """
+        与 compute 相同，但在后台线程中计算，不阻塞界面。
+
+        每组共享横坐标的曲线提交为一个任务，任务键由曲线 id 组成，
+        同一组曲线的重复请求会取代尚未完成的旧请求。
+        结果在主线程中写回曲线并通知数据中心。
+
+        参数:
+            service : ComputeService
+                执行任务的计算服务。
+            protect_peak, peak_params, **params :
+                同 compute。
+        """
+        from app.services.data_center import ParamKey
+
         method = self.data_center.params.get(
             ParamKey.BASELINE_METHOD, BaselineMethod.SNIP)
 
-        x = np.asarray(curve.displayed_x, dtype=float)
-        y = np.asarray(curve.displayed_y, dtype=float)
+        for x, curves in self._group_by_axis(self.data_center.curves.values()):
+            Y = np.stack([np.asarray(c.displayed_y, dtype=float)
+                          for c in curves])
+            key = ("baseline", tuple(c.id for c in curves))
+            service.submit(key, self.baseline_batch, x, Y, method,
+                           protect_peak, peak_params,
+                           on_result=partial(self._apply_baselines, curves),
+                           **params)
+
+    def _store_baselines(self, curves, batch):
+        from app.services.data_center import CurveField
+
+        stored = {}
+        for curve, baseline in zip(curves, batch):
+            # 计算期间被移除的曲线不再写回
+            if curve.id not in self.data_center.curves:
+                continue
+            curve.baseline = baseline
+            stored[curve.id] = baseline
+            self.data_center.update_curve(curve, {CurveField.BASELINE})
+        return stored
+
+    def _apply_baselines(self, curves, batch):
+        self.data_center.begin_batch()
+        self._store_baselines(curves, batch)
+        self.data_center.end_batch()
+
+    def baseline_batch(self, x, Y, method=BaselineMethod.SNIP,
+                       protect_peak=False, peak_params=None, **params):
+        """
+        对共享横坐标的多条扫描批量计算背景。
+
+        SNIP、滚动球、多项式、改进多项式和ALS对整个二维数组向量化计算；
+        anchor 逐行插值。
+
+        参数:
+            x : array-like, shape (n_points,)
+                共享的横坐标。
+            Y : array-like, shape (n_scans, n_points)
+                每行一条扫描的强度。
+            method : str, 可选
+                背景估算方法，见 BaselineMethod。
+            protect_peak : bool, 可选
+                是否逐行启用峰保护。
+            peak_params : dict, 可选
+                峰检测相关参数字典。
+            **params : dict
+                传递给具体背景算法的参数。
+
+        返回:
+            baselines : ndarray, shape (n_scans, n_points)
+                每条扫描的背景。
+        """
+        x = np.asarray(x, dtype=float)
+        Y = np.atleast_2d(np.asarray(Y, dtype=float))
 
         if protect_peak:
-            mask = self._peak_mask(y, peak_params or {})
-            y_for_baseline = self._apply_mask(y, mask)
-        else:
-            mask = None
-            y_for_baseline = y
-
-        # 调用算法
-        if method == "snip":
-            baseline = self.baseline_snip(y_for_baseline, **params)
-        elif method == "als":
-            baseline = self.baseline_als(y_for_baseline, **params)
-        elif method == "poly":
-            baseline = self.baseline_poly(x, y_for_baseline, **params)
-        elif method == "rolling_ball":
-            baseline = self.baseline_rolling_ball(y_for_baseline, **params)
-        elif method == "modpoly":
-            baseline = self.baseline_modpoly(x, y_for_baseline)
-        elif method == "anchor":
-            baseline = self.baseline_anchor(y_for_baseline, **params)
+            Y = np.stack([self._apply_mask(y, self._peak_mask(y, peak_params or {}))
+                          for y in Y])
+
+        if method == BaselineMethod.SNIP:
+            return self.baseline_snip(Y, **params)
+        elif method == BaselineMethod.ALS:
+            return self.baseline_als(Y, **params)
+        elif method == BaselineMethod.POLY:
+            return self.baseline_poly(x, Y, **params)
+        elif method == BaselineMethod.ROLLING_BALL:
+            return self.baseline_rolling_ball(Y, **params)
+        elif method == BaselineMethod.MOD_POLY:
+            return self.baseline_modpoly(x, Y, **params)
+        elif method == BaselineMethod.ANCHOR:
+            return np.stack([self.baseline_anchor(x, y, **params) for y in Y])
         else:
             raise ValueError("Unknown method")
-        print("baseline method:", method)
-        curve.baseline = baseline
-        self.data_center.update_curve(curve)
-        return baseline, y - baseline, mask
+
+    def _group_by_axis(self, curves):
+        """
+        将曲线按共享的横坐标分组，同一文件内横坐标相同的曲线归为一组。
+
+        返回:
+            list of (x, list[Curve])
+        """
+        groups = {}
+        for curve in curves:
+            x = np.asarray(curve.displayed_x, dtype=float)
+            for gx, members in groups.get(curve.file_id, []):
+                if gx.shape == x.shape and np.array_equal(gx, x):
+                    members.append(curve)
+                    break
+            else:
+                groups.setdefault(curve.file_id, []).append((x, [curve]))
+        return [group for file_groups in groups.values()
+                for group in file_groups]
 
     # ------------------ Peak Mask ------------------
     def _peak_mask(self, y, params):
@@ -114,6 +252,8 @@ class XRDBackground:
             mask : ndarray of bool
                 表示峰所在区域的布尔掩码数组。
         """
+        from scipy.signal import find_peaks
+
         peaks, _ = find_peaks(
             y,
             height=params.get("height", None),
@@ -147,13 +287,14 @@ class XRDBackground:
         y2[mask] = np.min(y[~mask])
         return y2
 
+    @cached_result
     def baseline_snip(self, y, iterations=30):
         """
         SNIP算法实现，适用于X射线衍射图谱背景估计。
 
         参数:
             y : array-like
-                输入信号数据。
+                输入信号数据，二维时每行为一条扫描。
             iterations : int, 可选
                 迭代次数，默认为30次。
 
@@ -161,59 +302,48 @@ class XRDBackground:
             b : ndarray
                 估算出的背景信号。
         """
-        y = np.array(y, dtype=float)
-        b = y.copy()
-        L = len(y)
+        b = np.array(y, dtype=float)
+        L = b.shape[-1]
 
         for k in range(1, iterations + 1):
             # 标准 SNIP 公式：b[i] = min(b[i], (b[i-k] + b[i+k]) / 2)
             # 我们只更新中间能被索引到的部分 [k : L-k]
-            left = b[0: L-2*k]      # 对应 b[i-k]
-            right = b[2*k: L]       # 对应 b[i+k]
-            mid = b[k: L-k]         # 对应 b[i]
+            left = b[..., 0: L-2*k]      # 对应 b[i-k]
+            right = b[..., 2*k: L]       # 对应 b[i+k]
+            mid = b[..., k: L-k]         # 对应 b[i]
 
-            b[k: L-k] = np.minimum(mid, (left + right) / 2)
+            b[..., k: L-k] = np.minimum(mid, (left + right) / 2)
         return b
 
-    def baseline_als(self, y, lam=1e5, p=0.01):
+    @cached_result
+    def baseline_als(self, y, lam=1e5, p=0.01, niter=10):
         """
         使用非对称最小二乘法(Asymmetric Least Squares)计算信号基线
 
         参数:
-            y: array-like, 输入信号数据
+            y: array-like, 输入信号数据，二维时每行为一条扫描
             lam: float, 平滑参数，控制基线的平滑程度，默认为1e5
             p: float, 不对称参数，控制对峰值的惩罚程度，默认为0.01
+            niter: int, 最大迭代次数，权重收敛后提前停止，默认为10
 
         返回:
             z: array, 计算得到的基线信号
         """
-        # 构建二阶差分矩阵用于平滑约束
-        L = len(y)
-        D = sparse.diags([1, -2, 1], [0, -1, -2], shape=(L, L-2))
-        D = D.dot(D.T)
-
-        # 迭代优化求解基线
-        w = np.ones(L)
-        for _ in range(10):
-            # 构建权重矩阵和系统矩阵
-            W = sparse.spdiags(w, 0, L, L)
-            Z = W + lam * D
-            # 求解线性方程组得到基线估计
-            z = spsolve(Z, w * y)
-            # 更新权重向量
-            w = p * (y > z) + (1 - p) * (y <= z)
-
-        return z
+        return self._asls_banded(y, lam, p, niter, strict=False)
 
+    @cached_result
     def baseline_poly(self, x, y, degree=4):
         """
         多项式拟合作为背景估计方法。
 
+        横坐标先缩放到 [-1, 1] 再构建 Vandermonde 矩阵，
+        二维输入时所有扫描共用该矩阵，通过一次 lstsq 求解。
+
         参数:
             x : array-like
                 横坐标数据。
             y : array-like
-                纵坐标数据。
+                纵坐标数据，二维时每行为一条扫描。
             degree : int, 可选
                 多项式的阶数，默认为4。
 
@@ -221,17 +351,16 @@ class XRDBackground:
             baseline : ndarray
                 拟合出的背景曲线。
         """
-        coeff = np.polyfit(x, y, degree)
-        baseline = np.polyval(coeff, x)
-        return baseline
+        return _poly_fit(x, y, degree)
 
+    @cached_result
     def baseline_rolling_ball(self, y, window=50):
         """
         滚动球背景估计算法，通过一维最小滤波器模拟“滚球”效果。
 
         参数:
             y : array-like
-                输入信号数据。
+                输入信号数据，二维时每行为一条扫描。
             window : int, 可选
                 滤波窗口大小，默认为50。
 
@@ -239,19 +368,24 @@ class XRDBackground:
             baseline : ndarray
                 估算出的背景信号。
         """
+        from scipy.ndimage import minimum_filter1d
+
         y = np.asarray(y)
-        baseline = minimum_filter1d(y, size=window, mode='nearest')
+        baseline = minimum_filter1d(y, size=window, mode='nearest', axis=-1)
         return baseline
 
+    @cached_result
     def baseline_modpoly(self, x, y, degree=5, iterations=5):
         """
         改进的多项式拟合背景估计方法，在迭代过程中排除高于当前拟合的部分。
 
+        每次迭代将信号截断到当前拟合以下再重新拟合。
+
         参数:
             x : array-like
                 横坐标数据。
             y : array-like
-                纵坐标数据。
+                纵坐标数据，二维时每行为一条扫描。
             degree : int, 可选
                 多项式阶数，默认为5。
             iterations : int, 可选
@@ -261,13 +395,15 @@ class XRDBackground:
             baseline : ndarray
                 估算出的背景信号。
         """
-        baseline = baseline_poly(x, y, degree)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        baseline = _poly_fit(x, y, degree)
         for _ in range(iterations):
-            mask = y > baseline
-            coeff = np.polyfit(x[mask], y[mask], degree)
-            baseline = np.polyval(coeff, x)
+            y = np.minimum(y, baseline)
+            baseline = _poly_fit(x, y, degree)
         return baseline
 
+    @cached_result
     def baseline_anchor(self, x, y, anchors):
         """
         锚点插值法构造背景曲线。
@@ -284,6 +420,8 @@ class XRDBackground:
             baseline : ndarray
                 插值得到的背景曲线。
         """
+        from scipy.interpolate import interp1d
+
         # anchors: list of (x_pos, y_pos)
         anchors = sorted(anchors, key=lambda t: t[0])
         ax, ay = zip(*anchors)
@@ -291,6 +429,7 @@ class XRDBackground:
         baseline = interp(x)
         return baseline
 
+    @cached_result
     def smooth_savgol(self, y, window=11, poly=3):
         """
         Savitzky-Golay平滑滤波器，常用于降噪和平滑处理。
@@ -307,10 +446,14 @@ class XRDBackground:
             smoothed_y : ndarray
                 平滑后的信号。
         """
+        from scipy.signal import savgol_filter
+
         return savgol_filter(y, window, poly)
 
     def detect_peaks_mask(self, y, height=None, distance=None,
                           half_width_factor=1.2):
+        from scipy.signal import find_peaks
+
         peaks, props = find_peaks(y, height=height, distance=distance)
         mask = np.ones_like(y, dtype=bool)
         # estimate FWHM-ish from prominence width if available; fallback to fixed
@@ -324,16 +467,60 @@ class XRDBackground:
             mask[lo:hi] = False
         return mask
 
+    @cached_result
     def asls_baseline(self, y, lam=1e6, p=0.01, niter=10):
-        L = len(y)
-        D = csc_matrix(np.diff(np.eye(L), 2))
-        w = np.ones(L)
-        for i in np.arange(niter):
-            W = spdiags(w, 0, L, L)
-            Z = W + lam * D.dot(D.transpose())
-            z = spsolve(Z, w*y)
-            w = p * (y > z) + (1-p) * (y < z)
-        return z
+        """
+        AsLS 基线，与 baseline_als 相同的带状求解，但 y == z 处权重为0。
+        """
+        return self._asls_banded(y, lam, p, niter, strict=True)
+
+    def _asls_banded(self, y, lam, p, niter, strict):
+        """
+        用对称带状 Cholesky 求解 (W + lam * DᵀD) z = W y 的非对称加权迭代。
+
+        惩罚带只构建一次，每次迭代仅复制并在主对角线上加权重；
+        当权重不再变化时提前结束。
+
+        参数:
+            y : array-like
+                输入信号数据，二维时每行为一条扫描。
+            lam : float
+                平滑参数。
+            p : float
+                不对称参数。
+            niter : int
+                最大迭代次数。
+            strict : bool
+                为True时 y == z 处的权重为0（asls_baseline 的约定），
+                否则为 1 - p（baseline_als 的约定）。
+
+        返回:
+            z : ndarray
+                计算得到的基线信号。
+        """
+        from scipy.linalg import solveh_banded
+
+        y = np.asarray(y, dtype=float)
+        shape = y.shape
+        # 多条扫描首尾相接成块对角系统：每块惩罚带的前两列上对角线为0，
+        # 块之间没有耦合，一次 solveh_banded 即可同时求解所有扫描
+        penalty = np.tile(_second_diff_penalty_band(shape[-1], lam),
+                          (1, y.size // shape[-1]))
+        y = y.ravel()
+        ab = np.empty_like(penalty)
+        w = np.ones(len(y))
+        for _ in range(niter):
+            ab[:] = penalty
+            ab[2] += w
+            z = solveh_banded(ab, w * y, check_finite=False)
+            if strict:
+                w_new = p * (y > z) + (1 - p) * (y < z)
+            else:
+                w_new = np.where(y > z, p, 1 - p)
+            if np.array_equal(w_new, w):
+                break
+            w = w_new
+        return z.reshape(shape)
 
     def fill_mask_by_interpolation(self, x, y, mask):
         """
@@ -345,12 +532,14 @@ class XRDBackground:
         return yi
 
     def calculate_baseline(self, x, y):
+        from scipy.signal import medfilt
+
         # Example pipeline
         x = np.arange(len(y))  # or real x-values
         mask = self.detect_peaks_mask(y)  # 你已有的 mask 布尔数组
 
         # 1) 插值填补（非常关键）
-        y_filled = self.fill_mask_by_interp(x, y, mask)
+        y_filled = self.fill_mask_by_interpolation(x, y, mask)
 
         # 2) 可选：用 median 去除孤立噪点（不会跨越 mask 边界，因为已插值）
         y_med = medfilt(y_filled, kernel_size=5)  # kernel_size 取奇数
@@ -360,6 +549,7 @@ class XRDBackground:
 
         return baseline
 
+    @cached_result
     def medfilt_smoothing(self, y):
         '''
         Smoothing by median filtering
@@ -367,9 +557,12 @@ class XRDBackground:
         :param self: Description
         :param y: Description
         '''
+        from scipy.signal import medfilt
+
         y_med = medfilt(y, kernel_size=5)
         return y_med
 
+    @cached_result
     def savgol_smoothing(self, x, y, windowlength, polyorder):
         '''
         Docstring for savgol_smoothing
@@ -380,9 +573,13 @@ class XRDBackground:
         :param windowlength: Description
         :param polyorder: Description
         '''
-        y_savgol = savgol_filter(x, y, windowlength, polyorder)
+        from scipy.signal import savgol_filter
+
+        y_savgol = savgol_filter(y, windowlength, polyorder)
         return y_savgol
 
     def remove_background(self, curve: Curve):
+        from scipy.signal import find_peaks
+
         y = curve.displayed_y
         peaks, props = find_peaks(y)
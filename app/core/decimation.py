@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class MinMaxPyramid:
+    """
+    曲线的最小/最大值金字塔，用于按屏幕分辨率抽稀绘图数据。
+
+    第 k 层把信号分成大小为 2**(k+1) 的桶，记录每个桶内最小值和最大值的索引。
+    各层由上一层两两合并得到，总构建代价 O(n)。抽稀时保留每个桶的极值点，
+    因此任何缩放级别下尖锐的衍射峰都不会丢失。
+    """
+
+    def __init__(self, y) -> None:
+        y = np.asarray(y, dtype=float)
+        self.n = len(y)
+        self.levels: list[tuple[np.ndarray, np.ndarray]] = []
+
+        imin = imax = np.arange(self.n, dtype=np.intp)
+        while len(imin) > 1:
+            if len(imin) % 2:
+                imin = np.append(imin, imin[-1])
+                imax = np.append(imax, imax[-1])
+            a, b = imin[0::2], imin[1::2]
+            imin = np.where(y[b] < y[a], b, a)
+            a, b = imax[0::2], imax[1::2]
+            imax = np.where(y[b] > y[a], b, a)
+            self.levels.append((imin, imax))
+
+    def indices(self, i0: int, i1: int, n_bins: int) -> np.ndarray:
+        """
+        返回 [i0, i1) 范围内抽稀后保留的点的索引（升序）。
+
+        选择桶数不少于 n_bins 的最粗一层，保留范围两端点以及每个桶的极值点。
+        范围内点数不超过 2 * n_bins 时不抽稀。
+
+        :param i0: 起始索引
+        :param i1: 结束索引（不含）
+        :param n_bins: 目标桶数，通常为坐标轴的像素宽度
+        """
+        count = i1 - i0
+        if count <= 2 * n_bins or not self.levels:
+            return np.arange(i0, i1)
+
+        level = min(int(np.log2(count / n_bins)) - 1, len(self.levels) - 1)
+        size = 2 ** (level + 1)
+        imin, imax = self.levels[level]
+        b0, b1 = i0 // size, -(-i1 // size)
+        idx = np.concatenate(([i0, i1 - 1], imin[b0:b1], imax[b0:b1]))
+        idx = np.unique(idx)
+        return idx[(idx >= i0) & (idx < i1)]
+
+
+def visible_range(x, lo: float, hi: float) -> tuple[int, int]:
+    """
+    单调横坐标 x 上 [lo, hi] 对应的索引范围，两侧各多留一个点使曲线延伸到边缘。
+
+    :return: (i0, i1)，i1 不含
+    """
+    n = len(x)
+    if n == 0:
+        return 0, 0
+    if x[0] <= x[-1]:
+        i0 = np.searchsorted(x, lo, "left")
+        i1 = np.searchsorted(x, hi, "right")
+    else:
+        r = x[::-1]
+        i0 = n - np.searchsorted(r, hi, "right")
+        i1 = n - np.searchsorted(r, lo, "left")
+    return max(int(i0) - 1, 0), min(int(i1) + 1, n)
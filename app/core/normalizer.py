@@ -0,0 +1,29 @@
+import numpy as np
+
+
+def normalize_max(y):
+    """
+    按最大值归一化到 [.., 1]。
+    """
+    y = np.asarray(y, dtype=float)
+    peak = np.max(y)
+    return y / peak if peak else y.copy()
+
+
+def normalize_minmax(y):
+    """
+    线性缩放到 [0, 1]。
+    """
+    y = np.asarray(y, dtype=float)
+    lo, hi = np.min(y), np.max(y)
+    return (y - lo) / (hi - lo) if hi > lo else np.zeros_like(y)
+
+
+def normalize_area(x, y):
+    """
+    按曲线下面积（梯形积分）归一化。
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    area = abs(np.sum((y[1:] + y[:-1]) * np.diff(x)) / 2)
+    return y / area if area else y.copy()
@@ -1,28 +1,467 @@
-from scipy.signal import find_peaks
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 
-from app.models.curve import Session
+import numpy as np
+
+from app.core.axis_conversion import DEFAULT_WAVELENGTH, two_theta_to_d
+from app.models.curve import Curve
+from app.models.peak_configs import PeakProfile
+
+PEAK_DTYPE = np.dtype([
+    ("position", float), ("height", float), ("fwhm", float),
+    ("shape", float), ("area", float),
+    ("position_err", float), ("height_err", float), ("fwhm_err", float),
+    ("shape_err", float), ("area_err", float), ("converged", bool),
+])
+
+PEAK_TABLE_COLUMNS = ("curve_id", "two_theta", "d_spacing", "height", "width")
+
+_LN2 = np.log(2)
+# 每个峰只在 ±WINDOW_FWHM 个半高宽内计算（Rietveld 软件常用的截断）
+WINDOW_FWHM = 8.0
+# 分段线性背景的最大节点数
+BACKGROUND_KNOTS = 32
+# 每个峰簇拟合的最大函数求值次数，达到时该簇的 converged 为 False
+MAX_NFEV = 200
+# 参数个数不超过该值的峰簇用稠密矩阵求解
+DENSE_PARAMS = 200
+# 峰数超过该值的峰簇按 ±CHAIN_FWHM 个半高宽再次拆分
+MAX_CLUSTER_PEAKS = 40
+CHAIN_FWHM = 3.0
+
+
+def _pseudo_voigt(u, height, eta):
+    """
+    pseudo-Voigt 线形及其对 (u, height, eta) 的偏导，u = (x - c) / fwhm。
+    """
+    lor = 1 / (1 + 4 * u**2)
+    gau = np.exp(-4 * _LN2 * u**2)
+    f = height * (eta * lor + (1 - eta) * gau)
+    df_du = height * (eta * -8 * u * lor**2 + (1 - eta) * -8 * _LN2 * u * gau)
+    df_dh = eta * lor + (1 - eta) * gau
+    df_deta = height * (lor - gau)
+    return f, df_du, df_dh, df_deta
+
+
+def _pearson_vii(u, height, m):
+    """
+    Pearson VII 线形及其对 (u, height, m) 的偏导，u = (x - c) / fwhm。
+    """
+    two_m = 2 ** (1 / m)
+    B = 1 + 4 * u**2 * (two_m - 1)
+    shape = B ** -m
+    f = height * shape
+    df_du = height * -m * B ** (-m - 1) * 8 * u * (two_m - 1)
+    df_dh = shape
+    df_dm = f * (-np.log(B) + 4 * u**2 * two_m * _LN2 / (m * B))
+    return f, df_du, df_dh, df_dm
+
+
+def _area(profile, height, fwhm, shape):
+    """
+    峰面积及其对 (height, fwhm, shape) 的偏导。
+    """
+    from scipy.special import gammaln
+
+    if profile == PeakProfile.PSEUDO_VOIGT:
+        k_lor, k_gau = np.pi / 2, np.sqrt(np.pi / (4 * _LN2))
+        k = shape * k_lor + (1 - shape) * k_gau
+        return (height * fwhm * k, fwhm * k, height * k,
+                height * fwhm * (k_lor - k_gau))
+    m = shape
+    log_k = (0.5 * np.log(np.pi) + gammaln(m - 0.5) - gammaln(m)
+             - 0.5 * np.log(2 ** (1 / m) - 1) - np.log(2))
+    k = np.exp(log_k)
+    # d(log k)/dm 用数值差分，足够用于误差传播
+    eps = 1e-6 * np.maximum(m, 1)
+    log_k2 = (0.5 * np.log(np.pi) + gammaln(m + eps - 0.5) - gammaln(m + eps)
+              - 0.5 * np.log(2 ** (1 / (m + eps)) - 1) - np.log(2))
+    dk_dm = k * (log_k2 - log_k) / eps
+    return height * fwhm * k, fwhm * k, height * k, height * fwhm * dk_dm
+
+
+def noise_level(y):
+    """
+    用一阶差分的中位绝对偏差（MAD）估计噪声标准差。
+
+    差分去掉了平滑的背景和宽峰，MAD 对少数尖峰不敏感；
+    两个独立噪声之差的标准差为 √2σ，故再除以 √2。
+    """
+    diff = np.diff(np.asarray(y, dtype=float), axis=-1)
+    mad = np.median(np.abs(diff - np.median(diff, axis=-1, keepdims=True)),
+                    axis=-1)
+    return 1.4826 * mad / np.sqrt(2)
+
+
+def _empty_table():
+    table = {name: np.empty(0) for name in PEAK_TABLE_COLUMNS}
+    table["curve_id"] = np.empty(0, dtype=object)
+    return table
+
+
+def _concat_tables(tables):
+    if not tables:
+        return _empty_table()
+    return {name: np.concatenate([t[name] for t in tables])
+            for name in PEAK_TABLE_COLUMNS}
+
+
+def _search_chunk(x, Y, curve_ids, snr, wavelength, options, noise=None):
+    """
+    进程池任务：对共用横坐标 x 的一组曲线 Y 找峰，返回列式峰表。
+    """
+    x = np.asarray(x, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    if noise is None:
+        noise = noise_level(Y)
+    tables = []
+    for curve_id, y, sigma in zip(curve_ids, Y, noise):
+        kwargs = dict(options)
+        if kwargs.get("prominence") is None:
+            kwargs["prominence"] = max(snr * sigma, np.finfo(float).tiny)
+        peaks = PeakDetector(y, x=x, **kwargs).detect_peaks()
+        tables.append({
+            "curve_id": np.full(len(peaks), curve_id, dtype=object),
+            "two_theta": peaks["position"],
+            "d_spacing": two_theta_to_d(peaks["position"], wavelength),
+            "height": peaks["height"],
+            "width": peaks["fwhm"],
+        })
+    return _concat_tables(tables)
 
 
 class PeakDetector:
     """
-    class of peak detecting operations, 
+    class of peak detecting operations,
     including peak-searching, background treatments...
+
+    先用 scipy.signal.find_peaks 找峰，再按 method 拟合线形（pseudo-Voigt
+    或 Pearson VII 加分段线性背景）。每个峰只在其初始半高宽的若干倍窗口内
+    计算，窗口相互重叠的峰组成一个峰簇，作为一个最小二乘问题同时拟合；
+    互不重叠的峰簇彼此独立求解。雅可比矩阵为解析的稀疏矩阵，以向量化方式构建。
+
+    method 默认为 none，只找峰不拟合；拟合前应给出 height 或 prominence
+    等阈值，否则噪声中的每个局部极大值都会被当作峰拟合。
     """
 
-    def __init__(self, y, method: str, height=None,
+    def __init__(self, y, method: str = PeakProfile.NONE, height=None,
                  threshold=None, distance=None, prominence=None,
                  width=None, wlen=None, rel_height=0.5,
-                 plateau_size=None) -> None:
+                 plateau_size=None, x=None) -> None:
         super().__init__()
-        self.y = y
+        self.y = np.asarray(y, dtype=float)
+        self.x = np.arange(len(self.y), dtype=float) if x is None \
+            else np.asarray(x, dtype=float)
+        self.method = method
         self.height = height
         self.threshold = threshold
         self.distance = distance
         self.prominence = prominence
         self.width = width
         self.wlen = wlen
+        self.rel_height = rel_height
+        self.plateau_size = plateau_size
+        self.fit_result = None
+
+    @classmethod
+    def detect_curves(cls, curves: list[Curve] | None = None,
+                      snr: float = 8.0,
+                      wavelength: float = DEFAULT_WAVELENGTH,
+                      max_workers: int | None = None, chunk_size: int = 32,
+                      **options):
+        """
+        对多条曲线并行找峰，汇总成一张列式峰表。
+
+        横坐标相同的曲线（如同一多列文件中的各列）合成二维数组一起送入进程；
+        每个进程任务最多包含 chunk_size 条曲线。未指定 prominence 时，
+        每条曲线的显著度阈值为 snr 倍的噪声标准差（见 noise_level）。
+
+        :param curves: 曲线列表，默认为数据中心中的所有曲线
+        :param snr: 自适应显著度阈值相对噪声的倍数
+        :param wavelength: 计算 d 值用的波长（Å），横坐标按 2θ 处理
+        :param max_workers: 进程数，默认为 CPU 核数；为 1 时在当前进程计算
+        :param chunk_size: 每个进程任务的曲线数
+        :param options: 传给构造函数的其他参数（distance、width 等）；
+                        method 默认为 none，只找峰不拟合
+        :return: dict，键为 PEAK_TABLE_COLUMNS，值为等长的一维数组
+        """
+        if curves is None:
+            # 数据中心依赖 Qt，只在需要时导入
+            from app.services.data_center import data_center
+            curves = list(data_center().curves.values())
+
+        groups: dict[int, list[Curve]] = {}
+        for curve in curves:
+            groups.setdefault(id(curve.displayed_x), []).append(curve)
+
+        tasks = []
+        for group in groups.values():
+            x = group[0].displayed_x
+            for i in range(0, len(group), chunk_size):
+                chunk = group[i:i + chunk_size]
+                Y = np.stack([np.asarray(c.displayed_y) for c in chunk])
+                tasks.append((x, Y, [c.id for c in chunk], None))
+        return cls._run_tasks(tasks, snr, wavelength, max_workers, options)
+
+    @classmethod
+    def detect_stack(cls, x, Y, curve_ids=None, snr: float = 8.0,
+                     wavelength: float = DEFAULT_WAVELENGTH,
+                     max_workers: int | None = None, chunk_size: int = 32,
+                     noise=None, **options):
+        """
+        对共用横坐标的二维强度数组（如原位测量序列）逐行并行找峰。
+
+        :param x: 横坐标（2θ）
+        :param Y: shape (n_curves, n_points) 的强度数组
+        :param curve_ids: 每一行的标识，默认为行号
+        :param noise: 每一行的噪声标准差，默认由 noise_level 估计。
+                      Y 经过平滑时差分估计会偏低，应传入平滑前的估计
+        :return: 同 detect_curves
+        """
+        Y = np.atleast_2d(Y)
+        if curve_ids is None:
+            curve_ids = list(range(len(Y)))
+        if noise is None:
+            noise = noise_level(Y)
+        noise = np.broadcast_to(np.asarray(noise, dtype=float), len(Y))
+        tasks = [(x, Y[i:i + chunk_size], list(curve_ids[i:i + chunk_size]),
+                  noise[i:i + chunk_size])
+                 for i in range(0, len(Y), chunk_size)]
+        return cls._run_tasks(tasks, snr, wavelength, max_workers, options)
+
+    @staticmethod
+    def _run_tasks(tasks, snr, wavelength, max_workers, options):
+        options.setdefault("method", PeakProfile.NONE)
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        if workers <= 1:
+            return _concat_tables([
+                _search_chunk(x, Y, ids, snr, wavelength, options, noise)
+                for x, Y, ids, noise in tasks])
+
+        # 可能从GUI或服务线程中调用，fork会复制被其他线程持有的锁
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(_search_chunk, x, Y, ids, snr,
+                                       wavelength, options, noise)
+                       for x, Y, ids, noise in tasks]
+            return _concat_tables([f.result() for f in futures])
+
+    def find_peaks(self):
+        """
+        :return: (峰索引, 以索引为单位的半高宽)
+        """
+        from scipy.signal import find_peaks, peak_widths
+
+        peaks, _ = find_peaks(
+            self.y, height=self.height, threshold=self.threshold,
+            distance=self.distance, prominence=self.prominence,
+            width=self.width, wlen=self.wlen, rel_height=self.rel_height,
+            plateau_size=self.plateau_size)
+        widths = peak_widths(self.y, peaks, rel_height=0.5, wlen=self.wlen)[0]
+        return peaks, widths
+
+    def detect_peaks(self):
+        """
+        找峰并按 method 拟合线形。
+
+        :return: PEAK_DTYPE 结构化数组；method 为 none 时只有位置、高度和
+                 半高宽的初始估计，误差为 NaN，converged 为 False
+        """
+        peaks, widths = self.find_peaks()
+        if self.method == PeakProfile.NONE or len(peaks) == 0:
+            return self._initial_table(peaks, widths)
+        return self.fit_peaks(peaks, widths)
+
+    def _initial_table(self, peaks, widths):
+        table = np.full(len(peaks), np.nan, dtype=PEAK_DTYPE)
+        step = np.abs(np.gradient(self.x))[peaks] if len(self.x) > 1 \
+            else np.ones(len(peaks))
+        table["position"] = self.x[peaks]
+        table["height"] = self.y[peaks]
+        table["fwhm"] = widths * step
+        table["converged"] = False
+        return table
+
+    def fit_peaks(self, peaks, widths):
+        """
+        拟合给定的所有峰。
+
+        计算窗口相互重叠的峰分为一簇，每簇单独求解；簇的规模只取决于峰的
+        重叠程度，与整条扫描上的峰数无关。峰数超过 MAX_CLUSTER_PEAKS 的
+        长链再按 ±CHAIN_FWHM 个半高宽拆分。达到 MAX_NFEV 仍未收敛的簇，
+        其峰的 converged 为 False，并发出 RuntimeWarning。
+
+        :param peaks: 峰的索引（升序）
+        :param widths: 以索引为单位的初始半高宽
+        :return: PEAK_DTYPE 结构化数组
+        """
+        w = np.maximum(widths, 1)
+        half = np.ceil(WINDOW_FWHM * w).astype(int)
+        lo = np.maximum(peaks - half, 0)
+        hi = np.minimum(peaks + half + 1, len(self.y))
+        # 某个峰的窗口起点不早于之前所有窗口的终点时，开始新的一簇
+        splits = np.flatnonzero(lo[1:] >= np.maximum.accumulate(hi)[:-1]) + 1
+
+        # 窗口首尾相接的长链（如噪声较大的低角度区域）整体求解时很难收敛，
+        # 在 ±CHAIN_FWHM 个半高宽内互不重叠的相邻峰之间断开，
+        # 断点取两峰间按半高宽加权的位置，两侧的峰只拟合各自一侧的数据，
+        # 对方的远端拖尾由背景吸收
+        counts = np.diff(np.concatenate([[0], splits, [len(peaks)]]))
+        long_chain = np.repeat(counts > MAX_CLUSTER_PEAKS, counts)
+        reach = np.maximum.accumulate(peaks + CHAIN_FWHM * w)
+        cuts = np.flatnonzero((peaks[1:] - CHAIN_FWHM * w[1:] >= reach[:-1])
+                              & long_chain[1:]) + 1
+        border = peaks[cuts - 1] + np.rint(
+            (peaks[cuts] - peaks[cuts - 1]) * w[cuts - 1]
+            / (w[cuts - 1] + w[cuts])).astype(int)
+        segment = np.searchsorted(cuts, np.arange(len(peaks)), side="right")
+        lo = np.maximum(lo, np.concatenate([[0], border])[segment])
+        hi = np.minimum(hi, np.concatenate([border, [len(self.y)]])[segment])
+        splits = np.union1d(splits, cuts)
+
+        tables, self.fit_result = [], []
+        for idx in np.split(np.arange(len(peaks)), splits):
+            table, result = self._fit_cluster(peaks[idx], lo[idx], hi[idx],
+                                              widths[idx])
+            tables.append(table)
+            self.fit_result.append(result)
+        table = np.concatenate(tables)
+
+        n_failed = np.count_nonzero(~table["converged"])
+        if n_failed:
+            # 通常经由 detect_peaks 调用，警告指向 detect_peaks 的调用者
+            warnings.warn(f"Peak fit did not converge within {MAX_NFEV} "
+                          f"evaluations for {n_failed} of {len(table)} peaks",
+                          RuntimeWarning, stacklevel=3)
+        return table
+
+    def _fit_cluster(self, peaks, lo, hi, widths):
+        """
+        同时拟合一簇窗口相互重叠的峰及其分段线性背景。
+
+        :param lo: 每个峰计算窗口的起始索引
+        :param hi: 每个峰计算窗口的结束索引（不含）
+        :return: (PEAK_DTYPE 结构化数组, least_squares 的结果)
+        """
+        from scipy import sparse
+        from scipy.optimize import least_squares
+
+        x, y = self.x, self.y
+        n_peaks = len(peaks)
+        pearson = self.method == PeakProfile.PEARSON_VII
+        profile = _pearson_vii if pearson else _pseudo_voigt
+
+        # 每个峰的计算窗口（固定的索引范围）展开成 (行, 峰) 对
+        sizes = hi - lo
+        pk = np.repeat(np.arange(n_peaks), sizes)
+        rows = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes,
+                                                  sizes) + lo[pk]
+        # 只对窗口覆盖到的点计算残差
+        points = np.unique(rows)
+        local = np.searchsorted(points, rows)
+        xp, yp = x[points], y[points]
+        n_pts = len(points)
+
+        # 背景为分段线性函数，节点在覆盖范围内均匀分布；
+        # 每个点只依赖相邻两个节点，对应雅可比矩阵的两个非零元
+        n_knots = int(np.clip(n_pts // 50, 2, BACKGROUND_KNOTS))
+        knots = np.linspace(xp.min(), xp.max(), n_knots)
+        seg = np.clip(np.searchsorted(knots, xp) - 1, 0, n_knots - 2)
+        t = (xp - knots[seg]) / (knots[seg + 1] - knots[seg])
+        bg_jac = np.concatenate([1 - t, t])
+
+        step = np.abs(np.gradient(x))[peaks] if len(x) > 1 \
+            else np.ones(n_peaks)
+        fwhm0 = np.maximum(widths, 1) * step
+        # 背景初值取每个节点附近点的低分位数，峰高初值相对局部背景估计
+        near = np.rint((xp - knots[0]) / (knots[1] - knots[0])).astype(int)
+        bg0 = np.array([np.percentile(yp[near == k], 10) if np.any(near == k)
+                        else np.nan for k in range(n_knots)])
+        filled = ~np.isnan(bg0)
+        bg0 = np.interp(knots, knots[filled], bg0[filled])
+        height0 = np.maximum(y[peaks] - np.interp(x[peaks], knots, bg0),
+                             1e-12)
+        shape0 = 1.5 if pearson else 0.5
+        n_params = 4 * n_peaks + n_knots
+        p0 = np.concatenate([
+            np.column_stack([x[peaks], height0, fwhm0,
+                             np.full(n_peaks, shape0)]).ravel(), bg0])
+
+        lower = np.column_stack([
+            x[peaks] - fwhm0, np.zeros(n_peaks), 0.1 * step,
+            np.full(n_peaks, 0.6 if pearson else 0.0)]).ravel()
+        upper = np.column_stack([
+            x[peaks] + fwhm0, np.full(n_peaks, np.inf), 20 * fwhm0,
+            np.full(n_peaks, 50.0 if pearson else 1.0)]).ravel()
+        lower = np.concatenate([lower, np.full(n_knots, -np.inf)])
+        upper = np.concatenate([upper, np.full(n_knots, np.inf)])
+        p0 = np.clip(p0, lower, upper)
+
+        cols = 4 * pk
+        jac_rows = np.concatenate([local] * 4 + [np.arange(n_pts)] * 2)
+        jac_cols = np.concatenate([cols, cols + 1, cols + 2, cols + 3,
+                                   4 * n_peaks + seg, 4 * n_peaks + seg + 1])
+
+        def evaluate(p):
+            params = p[:4 * n_peaks].reshape(n_peaks, 4)
+            c, h, w, s = (params[pk, i] for i in range(4))
+            u = (x[rows] - c) / w
+            f, df_du, df_dh, df_ds = profile(u, h, s)
+            return u, w, f, df_du, df_dh, df_ds
+
+        def residual(p):
+            f = evaluate(p)[2]
+            b = p[4 * n_peaks:]
+            model = np.bincount(local, weights=f, minlength=n_pts)
+            return model + (1 - t) * b[seg] + t * b[seg + 1] - yp
+
+        # 小的峰簇用稠密雅可比矩阵和精确的信赖域子问题求解，迭代次数更少
+        dense = n_params <= DENSE_PARAMS
+
+        def jacobian(p):
+            u, w, _, df_du, df_dh, df_ds = evaluate(p)
+            data = np.concatenate([-df_du / w, df_dh, -df_du * u / w, df_ds,
+                                   bg_jac])
+            J = sparse.csr_matrix((data, (jac_rows, jac_cols)),
+                                  shape=(n_pts, n_params))
+            return J.toarray() if dense else J
+
+        result = least_squares(residual, p0, jac=jacobian,
+                               bounds=(lower, upper), method="trf",
+                               tr_solver="exact" if dense else "lsmr",
+                               x_scale="jac", max_nfev=MAX_NFEV)
+
+        params = result.x[:4 * n_peaks].reshape(n_peaks, 4)
+        errors = self._covariance_blocks(result, n_pts, n_peaks)
+
+        table = np.empty(n_peaks, dtype=PEAK_DTYPE)
+        for i, field in enumerate(("position", "height", "fwhm", "shape")):
+            table[field] = params[:, i]
+            table[f"{field}_err"] = np.sqrt(np.maximum(
+                errors[:, i, i], 0))
+        area, da_dh, da_dw, da_ds = _area(self.method, params[:, 1],
+                                          params[:, 2], params[:, 3])
+        grad = np.column_stack([np.zeros(n_peaks), da_dh, da_dw, da_ds])
+        table["area"] = area
+        table["area_err"] = np.sqrt(np.maximum(
+            np.einsum("ni,nij,nj->n", grad, errors, grad), 0))
+        # status 为 0 表示达到 max_nfev 时仍未满足收敛条件
+        table["converged"] = result.status > 0
+        return table, result
 
-    def detect_peaks(self, ):
-        ...
+    def _covariance_blocks(self, result, n_pts, n_peaks):
+        """
+        由 (JᵀJ)⁻¹ s² 估计参数协方差，返回每个峰 4x4 的对角块。
+        """
+        from scipy import sparse
 
-    def detect_with_
+        J = result.jac
+        JtJ = (J.T @ J).toarray() if sparse.issparse(J) else J.T @ J
+        dof = max(n_pts - JtJ.shape[0], 1)
+        s2 = 2 * result.cost / dof
+        cov = np.linalg.pinv(JtJ) * s2
+        idx = np.arange(4 * n_peaks).reshape(n_peaks, 4)
+        return cov[idx[:, :, None], idx[:, None, :]]
@@ -1,3 +1,231 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from app.core.axis_conversion import DEFAULT_WAVELENGTH
+from app.core.baseline import XRDBackground
+from app.core.normalizer import normalize_area, normalize_max, normalize_minmax
+from app.models.axis_types import XType
+from app.models.baseline_configs import BaselineMethod
+from app.models.curve import Curve
+from app.services.axis_service import axis_service
+from app.services.data_center import CurveField, data_center
+
+
+class Stage(ABC):
+    """
+    预处理流水线中的一个声明式步骤。
+
+    步骤只由类型和参数描述，key() 相同的步骤对相同输入产生相同输出，
+    流水线据此判断哪些中间结果可以复用。子类须实现 apply。
+    """
+    name = ""
+
+    def __init__(self, **params) -> None:
+        self.params = params
+
+    def key(self):
+        return (type(self).__name__, tuple(sorted(
+            (k, repr(v)) for k, v in self.params.items())))
+
+    @abstractmethod
+    def apply(self, x, y):
+        """
+        :return: (x, y)
+        """
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{k}={v!r}" for k, v in self.params.items())
+        return f"{type(self).__name__}({args})"
+
+
+class CropStage(Stage):
+    """
+    截取 x_min <= x <= x_max 的区间。
+    """
+    name = "crop"
+
+    def __init__(self, x_min=None, x_max=None) -> None:
+        super().__init__(x_min=x_min, x_max=x_max)
+
+    def apply(self, x, y):
+        keep = np.ones(len(x), dtype=bool)
+        if self.params["x_min"] is not None:
+            keep &= x >= self.params["x_min"]
+        if self.params["x_max"] is not None:
+            keep &= x <= self.params["x_max"]
+        idx = np.flatnonzero(keep)
+        # 单调横坐标上保留的是连续一段，用切片返回视图而不复制
+        if len(idx) and idx[-1] - idx[0] + 1 == len(idx):
+            return x[idx[0]:idx[-1] + 1], y[idx[0]:idx[-1] + 1]
+        return x[keep], y[keep]
+
+
+class SmoothStage(Stage):
+    """
+    平滑：method 为 "savgol"（参数 window, poly）或 "median"（参数 window）。
+    """
+    name = "smooth"
+
+    def __init__(self, method="savgol", window=11, poly=3) -> None:
+        super().__init__(method=method, window=window, poly=poly)
+
+    def apply(self, x, y):
+        from scipy.signal import medfilt, savgol_filter
+
+        if self.params["method"] == "savgol":
+            return x, savgol_filter(y, self.params["window"],
+                                    self.params["poly"])
+        elif self.params["method"] == "median":
+            return x, medfilt(y, kernel_size=self.params["window"])
+        raise ValueError("Unknown smoothing method")
+
+
+class BaselineStage(Stage):
+    """
+    用 XRDBackground 估计背景并扣除。
+    """
+    name = "baseline"
+
+    def __init__(self, method=BaselineMethod.SNIP, **params) -> None:
+        super().__init__(method=method, **params)
+
+    def apply(self, x, y):
+        params = dict(self.params)
+        method = params.pop("method")
+        baseline = XRDBackground().baseline_batch(x, y[None], method,
+                                                  **params)[0]
+        return x, y - baseline
+
+
+class NormalizeStage(Stage):
+    """
+    归一化：method 为 "max"、"minmax" 或 "area"。
+    """
+    name = "normalize"
+
+    def __init__(self, method="max") -> None:
+        super().__init__(method=method)
+
+    def apply(self, x, y):
+        method = self.params["method"]
+        if method == "max":
+            return x, normalize_max(y)
+        elif method == "minmax":
+            return x, normalize_minmax(y)
+        elif method == "area":
+            return x, normalize_area(x, y)
+        raise ValueError("Unknown normalization method")
+
+
+class AxisStage(Stage):
+    """
+    转换横坐标类型（2θ、d 或 Q），结果由 axis_service 缓存并在曲线间共享。
+    """
+    name = "axis"
+
+    def __init__(self, to_type=XType.D_SPACING, from_type=XType.TWO_THETA,
+                 wavelength=DEFAULT_WAVELENGTH) -> None:
+        super().__init__(to_type=to_type, from_type=from_type,
+                         wavelength=wavelength)
+
+    def apply(self, x, y):
+        return axis_service().convert(x, self.params["from_type"],
+                                      self.params["to_type"],
+                                      self.params["wavelength"]), y
+
+
+class _Memo:
+    """
+    一条曲线的中间结果：输入数组引用，以及每一步的键和输出。
+    """
+
+    def __init__(self, x, y) -> None:
+        self.x = x
+        self.y = y
+        self.keys: list = []
+        self.outputs: list[tuple[np.ndarray, np.ndarray]] = []
+
+
 class PreProcessor:
-    def __init__(self):
-        ...
\ No newline at end of file
+    """
+    由声明式步骤组成的惰性预处理流水线。
+
+    只有请求某条曲线的结果时才计算；每条曲线的每一步输出都被记住，
+    修改某一步的参数后，只从该步开始向下游重新计算，上游结果直接复用。
+    """
+
+    def __init__(self, stages: list[Stage] | None = None) -> None:
+        self.stages: list[Stage] = list(stages or [])
+        self.data_center = data_center()
+        self._memo: dict[str, _Memo] = {}
+
+    def add_stage(self, stage: Stage):
+        self.stages.append(stage)
+
+    def remove_stage(self, name: str):
+        self.stages = [s for s in self.stages if s.name != name]
+
+    def set_params(self, name: str, **params):
+        """
+        修改名为 name 的步骤的参数，下游结果会在下次请求时重新计算。
+        """
+        for stage in self.stages:
+            if stage.name == name:
+                stage.params.update(params)
+                return
+        raise KeyError(name)
+
+    def evaluate(self, curve: Curve):
+        """
+        计算曲线经过整个流水线后的结果。
+
+        :return: (x, y)
+        """
+        memo = self._memo.get(curve.id)
+        if memo is None or memo.x is not curve.raw_x \
+                or memo.y is not curve.raw_y:
+            memo = _Memo(curve.raw_x, curve.raw_y)
+            self._memo[curve.id] = memo
+
+        keys = [stage.key() for stage in self.stages]
+        # 找到第一个参数变化的步骤，之前的输出全部复用
+        start = 0
+        while start < min(len(keys), len(memo.keys)) \
+                and keys[start] == memo.keys[start]:
+            start += 1
+        del memo.keys[start:], memo.outputs[start:]
+
+        if start:
+            x, y = memo.outputs[start - 1]
+        else:
+            x = np.asarray(curve.raw_x, dtype=float)
+            y = np.asarray(curve.raw_y, dtype=float)
+        for stage, key in zip(self.stages[start:], keys[start:]):
+            x, y = stage.apply(x, y)
+            memo.keys.append(key)
+            memo.outputs.append((x, y))
+        return x, y
+
+    def apply(self, curves=None):
+        """
+        对曲线执行流水线并把结果写入 displayed_x / displayed_y。
+
+        :param curves: 曲线列表，默认为数据中心中的所有曲线
+        """
+        if curves is None:
+            curves = list(self.data_center.curves.values())
+        self.data_center.begin_batch()
+        for curve in curves:
+            curve.displayed_x, curve.displayed_y = self.evaluate(curve)
+            self.data_center.update_curve(curve, {CurveField.DATA})
+        self.data_center.end_batch()
+
+    def invalidate(self, curve_id: str | None = None):
+        """
+        丢弃某条曲线（默认全部）的中间结果。
+        """
+        if curve_id is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(curve_id, None)
@@ -1,5 +1,5 @@
 from app.core.baseline import XRDBackground
-from app.core.pre_processing import PreProcessor
+from app.services.compute_service import ComputeService
 from app.services.data_center import data_center
 from app.views.mainwindow import MainWindow
 
@@ -8,15 +8,25 @@ class WindowController:
     def __init__(self, main_window: MainWindow):
         self.main_window = main_window
         self.data_center = data_center()
-        self.pre_processor = PreProcessor()
 
         self.baseline_calculator = XRDBackground()
-        
+        self.compute_service = ComputeService(parent=self.main_window)
+
         self._connect_signals()
 
     def _connect_signals(self):
         self.main_window.signal_calculate_baseline.connect(
-            self.baseline_calculator.compute)
+            self.calculate_baseline)
+        self.compute_service.jobFailed.connect(self.on_job_failed)
+
+    def calculate_baseline(self):
+        self.main_window.statusBar().clearMessage()
+        self.baseline_calculator.compute_async(self.compute_service)
+
+    def on_job_failed(self, key, error: str):
+        # 任务键的第一个元素为任务类型，如 ("baseline", 曲线 id...)
+        task = key[0] if isinstance(key, tuple) else key
+        self.main_window.statusBar().showMessage(f"{task} failed: {error}")
 
     def show_window(self):
         self.main_window.show()
@@ -3,6 +3,7 @@
 class XType:
     TWO_THETA = "2θ(°)"
     D_SPACING = "D-spacing(Å)"
+    Q = "Q(Å⁻¹)"
 
 
 class YType:
@@ -1,25 +1,87 @@
-
+import mmap
 from uuid import uuid4
 
 import numpy as np
 from numpy.typing import ArrayLike
 
 
+def is_mapped(a) -> bool:
+    """
+    数组是否位于内存映射文件上（页面由操作系统按需载入，不常驻内存）。
+    """
+    while a is not None:
+        if isinstance(a, (np.memmap, mmap.mmap)):
+            return True
+        a = getattr(a, "base", None)
+    return False
+
+
+def count_nbytes(arrays, seen: set | None = None) -> tuple[int, int]:
+    """
+    统计数组占用的字节数。
+
+    视图按其底层缓冲区（沿 base 找到的最外层数组）计算，同一缓冲区只计一次，
+    因此共享的横坐标和同一文件数据的各列视图不会重复计数。
+
+    :param arrays: 数组序列，None 会被跳过
+    :param seen: 已统计过的缓冲区，跨多次调用共享以避免重复计数
+    :return: (常驻内存字节数, 内存映射字节数)
+    """
+    if seen is None:
+        seen = set()
+    resident = mapped = 0
+    for a in arrays:
+        if not isinstance(a, np.ndarray):
+            continue
+        while isinstance(a.base, np.ndarray):
+            a = a.base
+        if id(a) in seen:
+            continue
+        seen.add(id(a))
+        if is_mapped(a):
+            mapped += a.nbytes
+        else:
+            resident += a.nbytes
+    return resident, mapped
+
+
 class Curve:
+    """
+    一条曲线。
+
+    raw_x 通常是所属 File 的只读横坐标（同一文件的所有曲线共享），
+    raw_y 是文件数据中对应列的视图；displayed_x / displayed_y 默认直接引用原始数组，
+    只有经过预处理后才指向新的数组。
+    """
+    __slots__ = ("id", "raw_x", "raw_y", "file_id", "label", "style",
+                 "displayed_x", "displayed_y", "baseline")
 
     def __init__(self, x: ArrayLike, y: ArrayLike, file_id: str, label: str):
         self.id = uuid4().hex
-        self.raw_x = np.array(x)
-        self.raw_y = y
+        self.raw_x = np.asarray(x)
+        self.raw_y = np.asarray(y)
         self.file_id = file_id
         self.label = label
 
         self.style = None
 
-        self.displayed_x = x
-        self.displayed_y = y
+        self.displayed_x = self.raw_x
+        self.displayed_y = self.raw_y
 
         self.baseline = None
 
+    def arrays(self):
+        return (self.raw_x, self.raw_y, self.displayed_x, self.displayed_y,
+                self.baseline)
+
+    def nbytes(self, seen: set | None = None) -> tuple[int, int]:
+        """
+        曲线引用的数组占用的字节数，共享的缓冲区只计一次。
+
+        :param seen: 见 count_nbytes
+        :return: (常驻内存字节数, 内存映射字节数)
+        """
+        return count_nbytes(self.arrays(), seen)
+
     def set_style(self):
         ...
@@ -1,12 +1,22 @@
-from matplotlib import color_sequences
-
 built_in_color_sequences = [
     'tab10', 'tab20', 'tab20b', 'tab20c', 'Pastel1', 'Pastel2', 'Paired',
     'Accent', 'Dark2', 'Set1', 'Set2', 'Set3', 'petroff10']
 
-built_in_colors = []
-for s in built_in_color_sequences:
-    built_in_colors.extend(color_sequences[s])
+_built_in_colors = None
+
+
+def __getattr__(name):
+    # built_in_colors 在第一次访问时才导入 matplotlib 并展开颜色序列
+    global _built_in_colors
+    if name == "built_in_colors":
+        if _built_in_colors is None:
+            from matplotlib import color_sequences
+
+            _built_in_colors = []
+            for s in built_in_color_sequences:
+                _built_in_colors.extend(color_sequences[s])
+        return _built_in_colors
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class CurveTag:
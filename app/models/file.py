@@ -1,23 +1,41 @@
-from app.models.curve import Curve
 from pathlib import Path
-
 from uuid import uuid4
 
+import numpy as np
+
+from app.models.curve import Curve, count_nbytes
+
 
 class File:
-    def __init__(self, path: str, data=[]) -> None:
+    def __init__(self, path: str, data=None) -> None:
         self.id = uuid4().hex
         self.filepath = Path(path)
-        self.raw_data = data
+        self.raw_data = np.asarray(data if data is not None else [])
+
+        # 横坐标的只读视图，由该文件的所有曲线共享
+        self.x = None
+        if self.raw_data.ndim == 2 and len(self.raw_data):
+            self.x = self.raw_data[0].view()
+            self.x.flags.writeable = False
 
         self.filename: str = Path(path).stem
 
         self.raw_x_type = ""
         self.raw_y_type = ""
         self.data_type = ""
+        # 入射波长（Å），None 表示未指定
+        self.wavelength: float | None = None
 
         self.curves: dict[str, Curve] = {}
 
     def add_curve(self, new_curve):
         self.curves[new_curve.id] = new_curve
 
+    def nbytes(self, seen: set | None = None) -> tuple[int, int]:
+        """
+        文件原始数据占用的字节数。
+
+        :param seen: 见 count_nbytes
+        :return: (常驻内存字节数, 内存映射字节数)
+        """
+        return count_nbytes((self.raw_data,), seen)
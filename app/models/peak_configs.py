@@ -0,0 +1,4 @@
+class PeakProfile:
+    NONE = "none"
+    PSEUDO_VOIGT = "pseudo_voigt"
+    PEARSON_VII = "pearson7"
@@ -1,3 +1,5 @@
+from pathlib import Path
+
 
 class Project:
     """
@@ -11,3 +13,6 @@ class Project:
         self.data_type = ""
         self.x_type = ""
         self.y_type = ""
+
+        # 导入数据的二进制缓存目录，None 时使用默认目录
+        self.cache_dir: Path | None = None
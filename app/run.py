@@ -0,0 +1,71 @@
+# run.py
+import argparse
+import os
+import threading
+
+APP = "app.views.app:app"
+
+
+def run_api(host: str = "127.0.0.1", port: int = 8000, workers: int = 1,
+            log_level: str = "error"):
+    """
+    启动 API 服务。workers > 1 时 uvicorn 以导入路径启动多个进程。
+    """
+    import uvicorn
+
+    uvicorn.run(APP, host=host, port=port, workers=workers,
+                log_level=log_level)
+
+
+def api_url(host: str, port: int) -> str:
+    """
+    界面访问 API 服务用的地址。监听所有地址时连接本机。
+    """
+    if host in ("", "0.0.0.0"):
+        host = "127.0.0.1"
+    elif host == "::":
+        host = "::1"
+    if ":" in host:
+        host = f"[{host}]"
+    return f"http://{host}:{port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="openxrd")
+    parser.add_argument("--headless", action="store_true",
+                        help="只运行 API 服务，不启动界面")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="uvicorn 进程数（仅 --headless）")
+    parser.add_argument("--pool-size", type=int,
+                        help="每个 uvicorn 进程的计算进程数，"
+                             "默认为 CPU 核数除以 --workers")
+    parser.add_argument("--max-pending", type=int,
+                        help="每个 uvicorn 进程的排队任务上限，超过时返回 429")
+    args = parser.parse_args(argv)
+
+    # 通过环境变量传给 uvicorn 的工作进程
+    workers = max(1, args.workers) if args.headless else 1
+    if args.pool_size:
+        os.environ["OPENXRD_WORKERS"] = str(args.pool_size)
+    elif "OPENXRD_WORKERS" not in os.environ:
+        os.environ["OPENXRD_WORKERS"] = str(
+            max(1, (os.cpu_count() or 1) // workers))
+    if args.max_pending:
+        os.environ["OPENXRD_MAX_PENDING"] = str(args.max_pending)
+
+    if args.headless:
+        run_api(args.host, args.port, workers, log_level="info")
+        return
+
+    from app.views.gui import run_gui
+
+    t = threading.Thread(target=run_api, args=(args.host, args.port),
+                         daemon=True)
+    t.start()
+    run_gui(api_url(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# GUI 与 FastAPI 后端之间的二进制数组传输格式
+import json
+import struct
+from typing import Iterator
+
+import numpy as np
+
+MEDIA_TYPE = "application/x-openxrd-array"
+# 多条消息连续排列，每条前加 8 字节小端长度
+STREAM_MEDIA_TYPE = "application/x-openxrd-array-stream"
+
+_PREFIX = struct.Struct("<I")
+_FRAME = struct.Struct("<Q")
+_ALIGN = 8
+
+
+def encode_arrays(data: np.ndarray, meta: dict | None = None) -> bytes:
+    """
+    把二维数组编码为二进制消息。
+
+    消息布局：4 字节小端头长度 + JSON 头（shape、dtype、meta），
+    头部补齐到 8 字节对齐，之后是小端 float64 的原始数据（C 顺序）。
+
+    :param data: shape (n_columns, n_points) 的数组
+    :param meta: 随数据传输的元信息
+    :return: 编码后的字节串
+    """
+    data = np.ascontiguousarray(data, dtype="<f8")
+    header = json.dumps({
+        "shape": list(data.shape),
+        "dtype": data.dtype.str,
+        "meta": meta or {},
+    }).encode("utf-8")
+    pad = -(_PREFIX.size + len(header)) % _ALIGN
+    header += b" " * pad
+    return b"".join([_PREFIX.pack(len(header)), header, memoryview(data)])
+
+
+def decode_arrays(body: bytes) -> tuple[np.ndarray, dict]:
+    """
+    解码 encode_arrays 生成的消息。
+
+    返回的数组是 body 上的只读零拷贝视图。
+
+    :param body: 消息字节串
+    :return: (data, meta)
+    """
+    (header_len,) = _PREFIX.unpack_from(body)
+    offset = _PREFIX.size + header_len
+    header = json.loads(bytes(body[_PREFIX.size:offset]))
+    shape = tuple(header["shape"])
+    data = np.frombuffer(body, dtype=np.dtype(header["dtype"]),
+                         count=int(np.prod(shape)), offset=offset)
+    return data.reshape(shape), header["meta"]
+
+
+def encode_frame(data: np.ndarray, meta: dict | None = None) -> bytes:
+    """
+    编码流中的一条消息：8 字节长度 + encode_arrays 的结果。
+    """
+    body = encode_arrays(data, meta)
+    return _FRAME.pack(len(body)) + body
+
+
+def iter_frames(body: bytes) -> Iterator[tuple[np.ndarray, dict]]:
+    """
+    逐条解码 encode_frame 消息拼接成的字节串。
+    """
+    view = memoryview(body)
+    offset = 0
+    while offset < len(view):
+        (size,) = _FRAME.unpack_from(view, offset)
+        offset += _FRAME.size
+        yield decode_arrays(view[offset:offset + size])
+        offset += size
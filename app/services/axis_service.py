@@ -0,0 +1,76 @@
+# 横坐标转换结果的共享缓存
+import threading
+import weakref
+
+import numpy as np
+
+from app.core.axis_conversion import DEFAULT_WAVELENGTH, convert_axis
+from app.models.axis_types import XType
+
+
+class AxisService:
+    """
+    缓存 2θ、d、Q 之间的横坐标转换结果。
+
+    键为横坐标数组所在的内存（地址、形状、步长和类型）以及转换类型和波长，
+    因此同一文件中共用一个 x 数组（或其视图）的所有曲线共享同一份结果，
+    切换坐标类型时不会对每条曲线重复计算。源数组被回收时对应的缓存自动删除。
+    结果为只读数组；源数组在缓存期间不应被原地修改。
+    """
+
+    def __init__(self) -> None:
+        self._views: dict[tuple, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _buffer_key(x: np.ndarray) -> tuple:
+        return (x.__array_interface__["data"][0], x.shape, x.strides,
+                x.dtype.str)
+
+    def convert(self, x, from_type: str, to_type: str,
+                wavelength: float | None = None) -> np.ndarray:
+        """
+        返回 x 从 from_type 转换到 to_type 的结果，同一源数组只计算一次。
+
+        :param x: 横坐标数组
+        :param from_type: XType 中的原始类型，空字符串视为 2θ
+        :param to_type: XType 中的目标类型
+        :param wavelength: 波长（Å），None 时使用 DEFAULT_WAVELENGTH
+        """
+        from_type = from_type or XType.TWO_THETA
+        if from_type == to_type:
+            return x
+        if wavelength is None:
+            wavelength = DEFAULT_WAVELENGTH
+        if not isinstance(x, np.ndarray):
+            x = np.asarray(x, dtype=float)
+
+        buffer_key = self._buffer_key(x)
+        key = (buffer_key, from_type, to_type, float(wavelength))
+        with self._lock:
+            view = self._views.get(key)
+        if view is not None:
+            return view
+
+        view = convert_axis(x, from_type, to_type, wavelength)
+        view.flags.writeable = False
+        with self._lock:
+            self._views[key] = view
+        weakref.finalize(x, self._drop, buffer_key)
+        return view
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def _drop(self, buffer_key: tuple):
+        with self._lock:
+            for key in [k for k in self._views if k[0] == buffer_key]:
+                del self._views[key]
+
+
+_axis_service = AxisService()
+
+
+def axis_service() -> AxisService:
+    return _axis_service
@@ -0,0 +1,304 @@
+# 分析结果目录（SQLite）
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from app.models.file import File
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id TEXT PRIMARY KEY,
+    sample TEXT NOT NULL,
+    path TEXT,
+    acquired TEXT,
+    wavelength REAL,
+    x_type TEXT
+);
+CREATE TABLE IF NOT EXISTS curves (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    file_id TEXT NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    label TEXT,
+    n_points INTEGER,
+    x_min REAL, x_max REAL,
+    y_min REAL, y_max REAL, y_mean REAL, y_std REAL
+);
+CREATE TABLE IF NOT EXISTS peaks (
+    curve INTEGER NOT NULL REFERENCES curves(rowid) ON DELETE CASCADE,
+    two_theta REAL NOT NULL,
+    d_spacing REAL,
+    height REAL,
+    width REAL
+);
+CREATE INDEX IF NOT EXISTS idx_files_sample ON files(sample);
+CREATE INDEX IF NOT EXISTS idx_files_acquired ON files(acquired);
+CREATE INDEX IF NOT EXISTS idx_curves_file ON curves(file_id);
+-- 覆盖索引：按 2θ 范围查峰时无需回表
+CREATE INDEX IF NOT EXISTS idx_peaks_position ON peaks(two_theta, curve);
+CREATE INDEX IF NOT EXISTS idx_peaks_curve ON peaks(curve);
+"""
+
+# 重复记录时原地更新而不是 INSERT OR REPLACE：REPLACE 先删除旧行，
+# 会级联删除其曲线和峰，曲线也会换一个新的 rowid
+_INSERT_FILE = """
+INSERT INTO files (id, sample, path, acquired, wavelength, x_type)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    sample = excluded.sample, path = excluded.path,
+    acquired = excluded.acquired, wavelength = excluded.wavelength,
+    x_type = excluded.x_type
+"""
+_INSERT_CURVE = """
+INSERT INTO curves (id, file_id, label, n_points,
+    x_min, x_max, y_min, y_max, y_mean, y_std)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    file_id = excluded.file_id, label = excluded.label,
+    n_points = excluded.n_points, x_min = excluded.x_min,
+    x_max = excluded.x_max, y_min = excluded.y_min, y_max = excluded.y_max,
+    y_mean = excluded.y_mean, y_std = excluded.y_std
+"""
+_INSERT_PEAK = """
+INSERT INTO peaks (curve, two_theta, d_spacing, height, width)
+VALUES (?, ?, ?, ?, ?)
+"""
+_FIND_PEAKS = """
+SELECT c.id, c.file_id, f.sample, p.two_theta, p.d_spacing, p.height, p.width
+FROM peaks AS p
+JOIN curves AS c ON c.rowid = p.curve
+JOIN files AS f ON f.id = c.file_id
+WHERE p.two_theta BETWEEN ? AND ?
+ORDER BY p.two_theta
+LIMIT ?
+"""
+_CURVE_PEAKS = """
+SELECT p.two_theta, p.d_spacing, p.height, p.width
+FROM peaks AS p JOIN curves AS c ON c.rowid = p.curve
+WHERE c.id = ?
+ORDER BY p.two_theta
+"""
+
+
+def default_catalog_path() -> Path:
+    """
+    默认目录数据库路径，可通过环境变量 OPENXRD_CATALOG 覆盖。
+    """
+    env = os.environ.get("OPENXRD_CATALOG")
+    if env:
+        return Path(env)
+    return Path.home() / ".openxrd" / "catalog.sqlite"
+
+
+class Catalog:
+    """
+    SQLite 分析结果目录：文件元数据、每条曲线的统计量和峰表。
+
+    数据库使用 WAL 模式，读写可以并发；连接放在连接池中复用，
+    每个连接缓存已编译的语句，所有 SQL 都是固定文本加参数绑定。
+    样品名、采集日期和峰位都建有索引，按 2θ 范围查峰只扫描索引中的一段。
+    """
+
+    def __init__(self, path: Path | str | None = None,
+                 pool_size: int = 4) -> None:
+        self.path = Path(path) if path else default_catalog_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+
+        with self.connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False,
+                               cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # 64 MB 页缓存，批量写入峰表时索引页不必反复换出
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        从连接池借出一个连接，块内为一个事务，正常结束时提交，异常时回滚。
+        池中没有空闲连接且已达到 pool_size 时等待归还。
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self._pool_size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._pool.get()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+    def add_file(self, file: File, sample: str | None = None,
+                 acquired: datetime | str | None = None):
+        """
+        记录文件元数据和其所有曲线的统计量。
+
+        已记录过的文件和曲线原地更新，曲线的整数主键和已有的峰保持不变。
+
+        :param sample: 样品名，默认为文件名
+        :param acquired: 采集时间，默认为文件修改时间（文件不存在时为当前时间）
+        """
+        if acquired is None:
+            try:
+                mtime = file.filepath.stat().st_mtime
+                acquired = datetime.fromtimestamp(mtime)
+            except OSError:
+                acquired = datetime.now()
+        if isinstance(acquired, datetime):
+            acquired = acquired.isoformat(timespec="seconds")
+
+        curves = list(file.curves.values())
+        rows = []
+        for curve in curves:
+            x = np.asarray(curve.raw_x, dtype=float)
+            y = np.asarray(curve.raw_y, dtype=float)
+            if len(y) == 0:
+                stats = [None] * 6
+            else:
+                stats = [float(x.min()), float(x.max()), float(y.min()),
+                         float(y.max()), float(y.mean()), float(y.std())]
+            rows.append((curve.id, file.id, curve.label, len(y), *stats))
+
+        with self.connection() as conn:
+            conn.execute(_INSERT_FILE, (
+                file.id, sample or file.filename, str(file.filepath),
+                acquired, file.wavelength, file.raw_x_type))
+            conn.executemany(_INSERT_CURVE, rows)
+
+    def has_file(self, file_id: str) -> bool:
+        with self.connection() as conn:
+            row = conn.execute("SELECT 1 FROM files WHERE id = ?",
+                               (file_id,)).fetchone()
+        return row is not None
+
+    def add_peaks(self, table: dict, replace: bool = False):
+        """
+        写入列式峰表（见 PeakDetector.detect_curves），曲线须已由 add_file 记录。
+
+        :param replace: 先删除表中各曲线已有的峰
+        """
+        ids, inverse = np.unique(np.asarray(table["curve_id"]).astype(str),
+                                 return_inverse=True)
+        with self.connection() as conn:
+            rowids = self._curve_rowids(conn, ids.tolist())
+            missing = [i for i, r in zip(ids, rowids) if r is None]
+            if missing:
+                raise KeyError(f"Curves not in catalog: {missing[:5]}")
+            if replace:
+                conn.executemany("DELETE FROM peaks WHERE curve = ?",
+                                 ((r,) for r in rowids))
+            rows = zip(np.asarray(rowids)[inverse].tolist(),
+                       *(np.asarray(table[k], dtype=float).tolist()
+                         for k in ("two_theta", "d_spacing", "height",
+                                   "width")))
+            conn.executemany(_INSERT_PEAK, rows)
+
+    @staticmethod
+    def _curve_rowids(conn, ids: list[str], chunk: int = 500) -> list:
+        """
+        按曲线 id 批量查出整数主键，查不到的为 None。
+        """
+        found = {}
+        for i in range(0, len(ids), chunk):
+            part = ids[i:i + chunk]
+            sql = ("SELECT id, rowid FROM curves WHERE id IN (%s)"
+                   % ",".join("?" * len(part)))
+            found.update(conn.execute(sql, part).fetchall())
+        return [found.get(i) for i in ids]
+
+    def remove_file(self, file_id: str):
+        with self.connection() as conn:
+            conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def find_peaks(self, two_theta_min: float, two_theta_max: float,
+                   limit: int = 100000) -> list[dict]:
+        """
+        查找 2θ 落在 [two_theta_min, two_theta_max] 内的所有峰。
+
+        :return: 每个峰一个 dict：curve_id、file_id、sample、two_theta、
+                 d_spacing、height、width
+        """
+        keys = ("curve_id", "file_id", "sample", "two_theta", "d_spacing",
+                "height", "width")
+        with self.connection() as conn:
+            rows = conn.execute(_FIND_PEAKS, (two_theta_min, two_theta_max,
+                                              limit)).fetchall()
+        return [dict(zip(keys, row)) for row in rows]
+
+    def curve_peaks(self, curve_id: str) -> list[dict]:
+        keys = ("two_theta", "d_spacing", "height", "width")
+        with self.connection() as conn:
+            rows = conn.execute(_CURVE_PEAKS, (curve_id,)).fetchall()
+        return [dict(zip(keys, row)) for row in rows]
+
+    def find_files(self, sample: str | None = None,
+                   acquired_from: str | None = None,
+                   acquired_to: str | None = None,
+                   limit: int = 1000, pattern: bool = False) -> list[dict]:
+        """
+        按样品名和采集时间范围（ISO 格式）查找文件。
+
+        :param sample: 样品名，默认精确匹配
+        :param pattern: 为 True 时 sample 按 SQL LIKE 模式匹配（% 和 _ 为
+                        通配符，字面的 %、_ 写作 \\%、\\_）
+        """
+        where, args = [], []
+        if sample is not None:
+            where.append("sample LIKE ? ESCAPE '\\'" if pattern
+                         else "sample = ?")
+            args.append(sample)
+        if acquired_from is not None:
+            where.append("acquired >= ?")
+            args.append(acquired_from)
+        if acquired_to is not None:
+            where.append("acquired <= ?")
+            args.append(acquired_to)
+        sql = "SELECT id, sample, path, acquired, wavelength, x_type FROM files"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY acquired LIMIT ?"
+        keys = ("id", "sample", "path", "acquired", "wavelength", "x_type")
+        with self.connection() as conn:
+            rows = conn.execute(sql, (*args, limit)).fetchall()
+        return [dict(zip(keys, row)) for row in rows]
+
+
+_catalog: Catalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def catalog() -> Catalog:
+    """
+    全局目录，首次调用时打开数据库。
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = Catalog()
+        return _catalog
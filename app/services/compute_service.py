@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+
+class ComputeService(QObject):
+    """
+    在线程池中运行耗时计算（背景、平滑等），结果回到主线程。
+
+    每个任务有一个键（如曲线 id），同一键的新请求会取代旧请求：
+    尚未开始的旧任务直接取消，已在运行的旧任务结果被丢弃。
+    回调始终在主线程中调用，可以直接操作 DataCenter。
+    """
+    jobFailed = Signal(object, str)
+    # 工作线程发出，跨线程连接自动排队到主线程
+    _jobDone = Signal(object, int, object)
+
+    def __init__(self, max_threads: int | None = None, parent=None) -> None:
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_threads or os.cpu_count() or 1,
+            thread_name_prefix="compute")
+        self._jobDone.connect(self._on_done)
+
+        self._generation: dict[Any, int] = {}
+        self._futures: dict[Any, Future] = {}
+        self._callbacks: dict[Any, Callable[[Any], None]] = {}
+
+    def submit(self, key, fn: Callable, *args,
+               on_result: Callable[[Any], None], **kwargs) -> None:
+        """
+        提交任务 fn(*args, **kwargs)，完成后在主线程调用 on_result(result)。
+
+        :param key: 任务键，同一键的请求会合并，只保留最新的一次
+        :param fn: 在工作线程中执行的函数，不应访问 Qt 对象
+        :param on_result: 结果回调
+        """
+        generation = self._generation.get(key, 0) + 1
+        self._generation[key] = generation
+
+        old = self._futures.get(key)
+        if old is not None:
+            old.cancel()
+
+        future = self.executor.submit(fn, *args, **kwargs)
+        self._futures[key] = future
+        self._callbacks[key] = on_result
+        future.add_done_callback(
+            lambda f: self._jobDone.emit(key, generation, f))
+
+    def cancel(self, key) -> None:
+        """
+        取消键对应的任务：未开始的撤回，正在运行的忽略其结果。
+        """
+        future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+            self._generation[key] += 1
+        self._callbacks.pop(key, None)
+
+    def is_pending(self, key) -> bool:
+        return key in self._futures
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    @Slot(object, int, object)
+    def _on_done(self, key, generation: int, future: Future) -> None:
+        # 已被取代或取消的任务
+        if self._generation.get(key) != generation or future.cancelled():
+            return
+        self._futures.pop(key, None)
+        callback = self._callbacks.pop(key, None)
+
+        error = future.exception()
+        if error is not None:
+            self.jobFailed.emit(key, repr(error))
+        elif callback is not None:
+            callback(future.result())
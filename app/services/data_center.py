@@ -5,12 +5,85 @@ from app.models.file import File
 from app.models.project import Project
 
 
+class CurveField:
+    """
+    曲线中可能变化的字段，用于变化通知。
+    """
+    DATA = "data"
+    BASELINE = "baseline"
+    STYLE = "style"
+
+    ALL = frozenset((DATA, BASELINE, STYLE))
+
+
+class Delta:
+    """
+    一组变化：新增、修改（附带变化的字段）和移除的对象 id。
+
+    多次变化可以用 merge 合并：先新增后移除的对象两者都不保留，
+    新增后又修改的仍只算新增，修改后移除的只算移除。
+    """
+
+    def __init__(self, added=(), changed=None, removed=()) -> None:
+        self.added: set[str] = set(added)
+        self.changed: dict[str, set[str]] = \
+            {k: set(v) for k, v in (changed or {}).items()}
+        self.removed: set[str] = set(removed)
+
+    def add(self, obj_id: str):
+        if obj_id in self.removed:
+            # 移除后重新加入，视为修改了全部字段
+            self.removed.discard(obj_id)
+            self.changed[obj_id] = set(CurveField.ALL)
+        else:
+            self.added.add(obj_id)
+
+    def change(self, obj_id: str, fields=CurveField.ALL):
+        if obj_id in self.added or obj_id in self.removed:
+            return
+        self.changed.setdefault(obj_id, set()).update(fields)
+
+    def remove(self, obj_id: str):
+        if obj_id in self.added:
+            self.added.discard(obj_id)
+            return
+        self.changed.pop(obj_id, None)
+        self.removed.add(obj_id)
+
+    def merge(self, other: "Delta"):
+        for obj_id in other.removed:
+            self.remove(obj_id)
+        for obj_id in other.added:
+            self.add(obj_id)
+        for obj_id, fields in other.changed.items():
+            self.change(obj_id, fields)
+
+    def ids(self) -> set[str]:
+        """
+        新增或修改的 id。
+        """
+        return self.added | self.changed.keys()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def __repr__(self) -> str:
+        return (f"Delta(added={len(self.added)}, changed={len(self.changed)},"
+                f" removed={len(self.removed)})")
+
+
 class DataCenter(QObject):
     curvesChanged = Signal()
     filesChanged = Signal()
+    # 携带 Delta 的细粒度通知，与上面两个信号同时发出
+    curvesUpdated = Signal(object)
+    filesUpdated = Signal(object)
 
     """
     数据中心类
+
+    每次增删改都记录到 Delta 中；批处理（可嵌套）期间只累积，
+    最外层 end_batch 时合并成一次通知，监听者只需处理变化的对象。
     """
 
     def __init__(self):
@@ -22,44 +95,105 @@ class DataCenter(QObject):
         self.project = Project()
 
         self.params = {}
+        # 峰表：名称到列式表（列名到一维数组，见 PeakDetector.detect_curves）
+        self.peak_tables: dict[str, dict] = {}
 
-        self._batch = False
-        self._dirty = False
+        self._batch_depth = 0
+        self._curve_delta = Delta()
+        self._file_delta = Delta()
 
     def add_curve(self, curve: Curve, file: File):
         file.add_curve(curve)
         self.curves[curve.id] = curve
+        self._curve_delta.add(curve.id)
+        self._notify()
 
-        if not self._batch:
-            self.curvesChanged.emit()
-        else:
-            self._dirty = True
+    def update_curve(self, curve: Curve, fields=CurveField.ALL):
+        """
+        :param fields: 变化的字段（CurveField），默认为全部
+        """
+        self.curves[curve.id] = curve
+        self._curve_delta.change(curve.id, fields)
+        self._notify()
+
+    def remove_curve(self, curve_id: str):
+        curve = self.curves.pop(curve_id)
+        file = self.files.get(curve.file_id)
+        if file is not None:
+            file.curves.pop(curve_id, None)
+        self._curve_delta.remove(curve_id)
+        self._notify()
 
     def add_file(self, file: File):
         self.files[file.id] = file
-
-        if not self._batch:
-            self.filesChanged.emit()
-        else:
-            self._dirty = True
+        self._file_delta.add(file.id)
+        self._notify()
+
+    def remove_file(self, file_id: str):
+        """
+        移除文件及其所有曲线。
+        """
+        self.begin_batch()
+        file = self.files.pop(file_id)
+        for curve_id in list(file.curves):
+            if curve_id in self.curves:
+                self.remove_curve(curve_id)
+        self._file_delta.remove(file_id)
+        self.end_batch()
 
     def begin_batch(self):
-        self._batch = True
+        self._batch_depth += 1
 
     def end_batch(self):
-        if self._dirty:
+        self._batch_depth = max(self._batch_depth - 1, 0)
+        self._notify()
+
+    def _notify(self):
+        if self._batch_depth:
+            return
+        file_delta, self._file_delta = self._file_delta, Delta()
+        curve_delta, self._curve_delta = self._curve_delta, Delta()
+        if file_delta:
+            self.filesUpdated.emit(file_delta)
             self.filesChanged.emit()
+        if curve_delta:
+            self.curvesUpdated.emit(curve_delta)
             self.curvesChanged.emit()
-        self._batch = False
-        self._dirty = False
+
+    def memory_report(self) -> dict:
+        """
+        统计所有文件和曲线引用的数组占用的内存，共享的缓冲区只计一次。
+
+        :return: dict，键为 n_files、n_curves、file_bytes（文件原始数据）、
+                 curve_bytes（曲线在文件数据之外引用的数组，如处理结果和背景）、
+                 curve_resident_bytes（curve_bytes 中的常驻部分）、
+                 resident_bytes（常驻内存合计）、mapped_bytes（内存映射合计）
+        """
+        seen = set()
+        file_bytes = mapped = 0
+        for file in self.files.values():
+            resident, m = file.nbytes(seen)
+            file_bytes += resident + m
+            mapped += m
+        curve_bytes = curve_resident = 0
+        for curve in self.curves.values():
+            resident, m = curve.nbytes(seen)
+            curve_bytes += resident + m
+            curve_resident += resident
+            mapped += m
+        return {
+            "n_files": len(self.files),
+            "n_curves": len(self.curves),
+            "file_bytes": file_bytes,
+            "curve_bytes": curve_bytes,
+            "curve_resident_bytes": curve_resident,
+            "resident_bytes": file_bytes + curve_bytes - mapped,
+            "mapped_bytes": mapped,
+        }
 
     def update_params(self, dict):
         self.params.update(dict)
 
-    def update_curve(self, curve: Curve):
-        self.curves[curve.id] = curve
-        self.curvesChanged.emit()
-
 
 _data_center = DataCenter()
 
@@ -1,12 +1,21 @@
 # 数据管理类
-from operator import ne
+import glob
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
+from typing import Callable
 
 import numpy as np
 
 from app.models.curve import Curve
 from app.models.file import File
 from app.services.data_center import data_center
+from app.services.scan_cache import ScanCache, parse_cached
+from app.services.text_parser import SUPPORTED_SUFFIXES, read_table
+
+# 导入文件夹时检查取消和汇报进度的间隔（秒）
+POLL_INTERVAL = 0.1
 
 
 class DataIO:
@@ -15,32 +24,166 @@ class DataIO:
     Can read csv, txt and xrdml format.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, use_cache: bool = True) -> None:
         self.data_center = data_center()
-        pass
+        self.cache = ScanCache(self.data_center.project.cache_dir) \
+            if use_cache else None
 
     def read_file(self, path: Path | str):
         '''
-        Docstring for read_data
+        读取数据文件，返回 shape (n_columns, n_points) 的数组。
+
+        启用缓存时，首次导入解析文本并写入二进制缓存，之后直接内存映射，
+        每一列都是同一块只读内存上的零拷贝视图。
 
-        :param self: Description
-        :param path: Description
+        :param path: 数据文件路径
         '''
-        data = np.loadtxt(path).T
+        if self.cache is not None:
+            data = self.cache.load(path)
+            if data is not None:
+                return data
+
+        data = read_table(path).T
+        if self.cache is not None:
+            data = self.cache.store(path, data)
         return data
 
     def make_curves(self, path):
         file_data = self.read_file(path)
-        new_file = File(path, data=file_data)
-        x_data = file_data[0, :]
 
         self.data_center.begin_batch()
-        for i in range(file_data.shape[0]-1):
+        new_file = self._add_file(path, file_data)
+        self.data_center.end_batch()
+        return new_file
+
+    def _add_file(self, path, file_data) -> File:
+        """
+        为解析好的数据创建 File 和每个强度列对应的 Curve，并加入数据中心。
+        """
+        new_file = File(path, data=file_data)
+        x_data = new_file.x
+
+        self.data_center.add_file(new_file)
+        n_curves = file_data.shape[0] - 1
+        for i in range(n_curves):
             y_data = file_data[i+1, :]
-            curve = Curve(x_data, y_data, new_file.id)
+            label = new_file.filename if n_curves == 1 \
+                else f"{new_file.filename} [{i+1}]"
+            curve = Curve(x_data, y_data, new_file.id, label)
             self.data_center.add_curve(curve, new_file)
+        return new_file
 
-        self.data_center.end_batch()
+    def find_files(self, source: Path | str) -> list[Path]:
+        """
+        列出待导入的文件：目录下所有支持格式的文件，或通配符匹配的文件。
+
+        :param source: 目录路径或通配符（如 "data/run_*.dat"）
+        """
+        source = Path(source)
+        if source.is_dir():
+            paths = [p for p in source.iterdir()
+                     if p.is_file() and p.suffix.lower() in SUPPORTED_SUFFIXES]
+        else:
+            paths = [Path(p) for p in glob.glob(str(source))]
+        return sorted(paths)
+
+    def import_folder(self, source: Path | str,
+                      max_workers: int | None = None,
+                      chunk_size: int = 64,
+                      progress: Callable[[int, int], None] | None = None,
+                      cancelled: Callable[[], bool] | None = None
+                      ) -> list[File]:
+        '''
+        批量导入目录或通配符匹配的所有文件。
+
+        文件在进程池中并行解析，按 find_files 的顺序分批加入数据中心，
+        每批 chunk_size 个文件，只触发一次 curvesChanged。
+        解析失败的文件记录在 failed_imports 中。
+
+        :param source: 目录路径或通配符
+        :param max_workers: 进程数，默认为 CPU 核数
+        :param chunk_size: 每批加入数据中心的文件数
+        :param progress: 进度回调 progress(done, total)，解析期间每
+                         POLL_INTERVAL 秒至少调用一次
+        :param cancelled: 返回True时停止导入：未开始的文件被取消，不等待
+                          正在解析的文件，已完成的文件仍按顺序加入
+        :return: 导入的 File 列表
+        '''
+        paths = self.find_files(source)
+        cache_dir = str(self.cache.cache_dir) if self.cache is not None \
+            else None
+        self.failed_imports: dict[Path, Exception] = {}
+
+        imported: list[File] = []
+        pending: list[tuple[Path, np.ndarray]] = []
+        # 已完成但还不能按顺序加入的结果，解析失败的为 None
+        parsed: dict[int, np.ndarray | None] = {}
+        next_index = 0
+
+        def flush():
+            if not pending:
+                return
+            self.data_center.begin_batch()
+            for path, file_data in pending:
+                imported.append(self._add_file(path, file_data))
+            self.data_center.end_batch()
+            pending.clear()
+
+        def take_in_order():
+            nonlocal next_index
+            while next_index in parsed:
+                file_data = parsed.pop(next_index)
+                if file_data is not None:
+                    pending.append((paths[next_index], file_data))
+                next_index += 1
+
+        workers = max_workers or os.cpu_count() or 1
+        # GUI进程中有Qt等线程，fork出的子进程可能继承被锁住的锁，改用spawn
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"))
+        stopped = False
+        try:
+            futures = [executor.submit(parse_cached, str(p), cache_dir)
+                       for p in paths]
+            index = {future: i for i, future in enumerate(futures)}
+            not_done = set(futures)
+            while not_done:
+                # 限时等待，大文件解析期间也能响应取消
+                done, not_done = wait(not_done, timeout=POLL_INTERVAL,
+                                      return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = index[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.failed_imports[paths[i]] = e
+                        result = None
+                    else:
+                        if isinstance(result, str):
+                            result = np.load(result, mmap_mode="r")
+                    parsed[i] = result
+                take_in_order()
+
+                if len(pending) >= chunk_size:
+                    flush()
+                if progress is not None:
+                    progress(len(paths) - len(not_done), len(paths))
+                if cancelled is not None and cancelled():
+                    stopped = True
+                    for future in not_done:
+                        future.cancel()
+                    break
+        finally:
+            # 取消时不等待正在解析的文件，工作进程完成当前任务后自行退出
+            executor.shutdown(wait=not stopped, cancel_futures=True)
+
+        # 取消时前面的文件可能未完成，其后已完成的文件仍按顺序加入
+        for i in sorted(parsed):
+            if parsed[i] is not None:
+                pending.append((paths[i], parsed[i]))
+        flush()
+        return imported
 
     def setup_import_configs(self, file: File):
         ...
\ No newline at end of file
@@ -0,0 +1,200 @@
+# 本地参考相数据库与物相检索
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from app.core.axis_conversion import two_theta_to_d
+
+MATCH_DTYPE = np.dtype([
+    ("index", np.intp), ("score", float), ("ref_coverage", float),
+    ("obs_coverage", float), ("n_matched", np.intp),
+])
+
+
+def default_phase_dir() -> Path:
+    """
+    默认参考相目录，可通过环境变量 OPENXRD_PHASE_DB 覆盖。
+    """
+    env = os.environ.get("OPENXRD_PHASE_DB")
+    if env:
+        return Path(env)
+    return Path.home() / ".openxrd" / "phases"
+
+
+class ReferencePattern:
+    """
+    一个参考相的棒状衍射图：各衍射线的 d 值和相对强度（最强线为 100）。
+    """
+
+    def __init__(self, name: str, d, intensity, formula: str = "",
+                 source: str = "") -> None:
+        self.name = name
+        self.formula = formula
+        self.source = source
+        self.d = np.asarray(d, dtype=float)
+        intensity = np.asarray(intensity, dtype=float)
+        peak = intensity.max() if len(intensity) else 0
+        self.intensity = intensity * (100 / peak) if peak > 0 else intensity
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        由 JSON 记录创建。记录中给出 "d"，或给出 "two_theta" 和 "wavelength"。
+        """
+        if "d" in data:
+            d = data["d"]
+        else:
+            d = two_theta_to_d(data["two_theta"], data["wavelength"])
+        return cls(data["name"], d, data["intensity"],
+                   formula=data.get("formula", ""),
+                   source=data.get("source", ""))
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "formula": self.formula,
+                "source": self.source, "d": self.d.tolist(),
+                "intensity": self.intensity.tolist()}
+
+    def __repr__(self) -> str:
+        return f"ReferencePattern({self.name!r}, {len(self.d)} lines)"
+
+
+class PhaseDatabase:
+    """
+    基于本地文件的参考相库，完全离线。
+
+    目录下每个 .json 文件包含一条记录、一个记录列表，或 {"patterns": [...]}。
+    所有参考相的衍射线合并成一个按 d 排序的索引，检索时对每个实测峰的容差窗口
+    做二分查找，一次向量化计算即可给所有候选相打分。
+    """
+
+    def __init__(self, path: Path | str | None = None) -> None:
+        self.path = Path(path) if path else default_phase_dir()
+        self.patterns: list[ReferencePattern] = []
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __getitem__(self, index) -> ReferencePattern:
+        return self.patterns[index]
+
+    def load(self):
+        """
+        读取 path（目录或单个 JSON 文件）中的全部参考相。
+        """
+        files = sorted(self.path.glob("*.json")) if self.path.is_dir() \
+            else [self.path]
+        for file in files:
+            with open(file, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get("patterns", [data])
+            for record in data:
+                self.patterns.append(ReferencePattern.from_dict(record))
+        self._index = None
+        return self
+
+    def save(self, path: Path | str | None = None):
+        """
+        把全部参考相写入一个 JSON 文件，默认为 path 目录下的 patterns.json。
+        """
+        path = Path(path) if path else self.path / "patterns.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"patterns": [p.to_dict() for p in self.patterns]}, f)
+
+    def add(self, pattern: ReferencePattern):
+        self.patterns.append(pattern)
+        self._index = None
+
+    def _build_index(self):
+        """
+        合并所有衍射线并按 d 排序：(d, 强度, 所属相的序号)。
+        """
+        if self._index is None:
+            d = np.concatenate([p.d for p in self.patterns] or [[]])
+            intensity = np.concatenate(
+                [p.intensity for p in self.patterns] or [[]])
+            phase = np.repeat(np.arange(len(self.patterns)),
+                              [len(p.d) for p in self.patterns])
+            order = np.argsort(d, kind="stable")
+            self._index = d[order], intensity[order], phase[order]
+        return self._index
+
+    def search(self, d_obs, tol: float = 0.005, min_intensity: float = 5.0,
+               min_matches: int = 2, top: int = 20) -> np.ndarray:
+        """
+        用实测峰的 d 值检索参考相。
+
+        参考线与实测峰的相对偏差不超过 tol 即为匹配，只考虑相对强度不低于
+        min_intensity 的参考线。打分为两个覆盖率之积：
+        ref_coverage 为实测 d 范围内参考线强度被匹配的比例，
+        obs_coverage 为能被该相解释的实测峰比例。
+
+        :param d_obs: 实测峰的 d 值（Å）
+        :param tol: 相对容差 |Δd| / d
+        :param min_intensity: 参与匹配的参考线最低相对强度
+        :param min_matches: 候选相至少匹配的参考线条数
+        :param top: 返回的候选数
+        :return: MATCH_DTYPE 结构化数组，按 score 降序；index 为 patterns 中的序号
+        """
+        d_obs = np.sort(np.asarray(d_obs, dtype=float))
+        d_obs = d_obs[np.isfinite(d_obs)]
+        n_phases = len(self.patterns)
+        if len(d_obs) == 0 or n_phases == 0:
+            return np.empty(0, dtype=MATCH_DTYPE)
+        d_ref, i_ref, phase = self._build_index()
+        strong = i_ref >= min_intensity
+
+        # 每个实测峰的容差窗口对应排序索引中的一段 [lo, hi)
+        lo = np.searchsorted(d_ref, d_obs * (1 - tol), "left")
+        hi = np.searchsorted(d_ref, d_obs * (1 + tol), "right")
+        counts = hi - lo
+        obs = np.repeat(np.arange(len(d_obs)), counts)
+        lines = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts,
+                                                    counts) + lo[obs]
+        keep = strong[lines]
+        obs, lines = obs[keep], lines[keep]
+
+        matched = np.unique(lines)
+        n_matched = np.bincount(phase[matched], minlength=n_phases)
+        i_matched = np.bincount(phase[matched], weights=i_ref[matched],
+                                minlength=n_phases)
+
+        r0, r1 = lo[0], hi[-1]
+        in_range = slice(r0, r1)
+        i_range = np.bincount(phase[in_range],
+                              weights=i_ref[in_range] * strong[in_range],
+                              minlength=n_phases)
+
+        pairs = np.unique(obs * n_phases + phase[lines])
+        n_explained = np.bincount(pairs % n_phases, minlength=n_phases)
+
+        candidates = np.flatnonzero(n_matched >= min_matches)
+        result = np.empty(len(candidates), dtype=MATCH_DTYPE)
+        result["index"] = candidates
+        result["ref_coverage"] = i_matched[candidates] / i_range[candidates]
+        result["obs_coverage"] = n_explained[candidates] / len(d_obs)
+        result["score"] = result["ref_coverage"] * result["obs_coverage"]
+        result["n_matched"] = n_matched[candidates]
+        order = np.argsort(-result["score"], kind="stable")
+        return result[order[:top]]
+
+    def search_table(self, table: dict, **kwargs) -> dict:
+        """
+        对批量找峰得到的列式峰表（见 PeakDetector.detect_curves）逐条曲线检索。
+
+        :param table: 含 curve_id 和 d_spacing 列的峰表
+        :param kwargs: 传给 search 的参数
+        :return: dict，曲线 id 到 search 结果
+        """
+        ids = np.asarray(table["curve_id"])
+        d = np.asarray(table["d_spacing"])
+        order = np.argsort(ids, kind="stable")
+        ids, d = ids[order], d[order]
+        keys, starts = np.unique(ids, return_index=True)
+        bounds = np.append(starts, len(ids))
+        return {key: self.search(d[bounds[i]:bounds[i + 1]], **kwargs)
+                for i, key in enumerate(keys)}
@@ -0,0 +1,300 @@
+# 与界面无关的批处理流程：解析、平滑、背景和找峰
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from app.core.baseline import XRDBackground
+from app.core.peak_detector import PeakDetector, noise_level
+from app.models.baseline_configs import BaselineMethod
+from app.models.curve import Curve
+from app.models.file import File
+from app.models.peak_configs import PeakProfile
+from app.services.array_transport import encode_frame
+from app.services.catalog import catalog
+from app.services.text_parser import read_table
+
+
+class Operation:
+    SMOOTH = "smooth"
+    BASELINE = "baseline"
+    PEAKS = "peaks"
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_bound(value):
+    """scipy.signal.find_peaks 的条件：数值、None 或 [下限, 上限]。"""
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return all(v is None or _is_number(v) for v in value)
+    return value is None or _is_number(value)
+
+
+def _one_of(cls):
+    values = {v for k, v in vars(cls).items() if not k.startswith("_")}
+    return lambda value: value in values
+
+
+SMOOTH_METHODS = ("savgol", "median")
+
+# 背景峰保护（XRDBackground._peak_mask）的找峰参数
+PEAK_MASK_PARAMS = {
+    "height": _is_bound,
+    "prominence": _is_bound,
+    "distance": lambda v: v is None or _is_number(v) and v >= 1,
+    "width": lambda v: _is_int(v) and v >= 0,
+}
+
+# 每种步骤可以指定的参数及其取值检查；noise、max_workers 等由 run_steps
+# 自己传入
+STEP_PARAMS = {
+    Operation.SMOOTH: {
+        "method": lambda v: v in SMOOTH_METHODS,
+        "window": lambda v: _is_int(v) and v > 0,
+        "poly": lambda v: _is_int(v) and v >= 0,
+    },
+    Operation.BASELINE: {
+        "method": _one_of(BaselineMethod),
+        "protect_peak": lambda v: isinstance(v, bool),
+        "peak_params": lambda v: isinstance(v, dict) and all(
+            k in PEAK_MASK_PARAMS and PEAK_MASK_PARAMS[k](p)
+            for k, p in v.items()),
+        "iterations": lambda v: _is_int(v) and v >= 0,
+        "lam": lambda v: _is_number(v) and v > 0,
+        "p": lambda v: _is_number(v) and 0 < v < 1,
+        "niter": lambda v: _is_int(v) and v > 0,
+        "degree": lambda v: _is_int(v) and v >= 0,
+        "window": lambda v: _is_int(v) and v > 0,
+        "anchors": lambda v: isinstance(v, (list, tuple)) and all(
+            isinstance(a, (list, tuple)) and len(a) == 2
+            and all(_is_number(c) for c in a) for a in v),
+    },
+    Operation.PEAKS: {
+        "snr": _is_number,
+        "wavelength": lambda v: _is_number(v) and v > 0,
+        "method": _one_of(PeakProfile),
+        "height": _is_bound,
+        "threshold": _is_bound,
+        "distance": lambda v: v is None or _is_number(v) and v >= 1,
+        "prominence": _is_bound,
+        "width": _is_bound,
+        "wlen": lambda v: v is None or _is_number(v),
+        "rel_height": lambda v: _is_number(v) and v >= 0,
+        "plateau_size": _is_bound,
+    },
+}
+
+
+def smooth_batch(Y, method="savgol", window=11, poly=3):
+    """
+    对二维数组逐行平滑。
+
+    :param method: "savgol" 或 "median"
+    """
+    from scipy.ndimage import median_filter
+    from scipy.signal import savgol_filter
+
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    if method == "savgol":
+        return savgol_filter(Y, window, poly, axis=-1)
+    elif method == "median":
+        return median_filter(Y, size=(1, window), mode="nearest")
+    raise ValueError("Unknown smoothing method")
+
+
+def validate_steps(steps) -> list[dict]:
+    """
+    检查处理步骤列表，每一步为 {"op": Operation 之一, 其他参数...}，
+    参数须在 STEP_PARAMS 中列出且取值通过其检查。
+    """
+    if not isinstance(steps, list):
+        raise ValueError("steps must be a list")
+    for step in steps:
+        if not isinstance(step, dict) or step.get("op") not in STEP_PARAMS:
+            raise ValueError(f"Invalid step: {step!r}")
+        checks = STEP_PARAMS[step["op"]]
+        unknown = set(step) - {"op"} - set(checks)
+        if unknown:
+            raise ValueError(f"Invalid parameters for {step['op']} step: "
+                             f"{', '.join(sorted(unknown))}")
+        invalid = [name for name, value in step.items()
+                   if name != "op" and not checks[name](value)]
+        if invalid:
+            raise ValueError(f"Invalid values for {step['op']} step: " +
+                             ", ".join(f"{name}={step[name]!r}"
+                                       for name in invalid))
+    return steps
+
+
+def run_steps(x, Y, steps: list[dict]) -> dict:
+    """
+    按顺序对共享横坐标的一组扫描执行处理步骤。
+
+    平滑替换当前强度；背景只记录不扣除，之后的找峰在扣除背景后的强度上进行。
+    找峰的噪声水平总是在平滑前的原始强度上估计。
+
+    :param x: 横坐标（2θ）
+    :param Y: shape (n_curves, n_points) 的强度
+    :param steps: 见 validate_steps
+    :return: dict：x、y（处理后的强度）、baseline（无背景步骤时为 None）、
+             peaks（列式峰表，curve_id 为 Y 的行号；无找峰步骤时为 None）
+    """
+    x = np.asarray(x, dtype=float)
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    baseline = peaks = noise = None
+    for step in steps:
+        params = dict(step)
+        op = params.pop("op")
+        if op == Operation.SMOOTH:
+            if noise is None:
+                noise = noise_level(Y)
+            Y = smooth_batch(Y, **params)
+        elif op == Operation.BASELINE:
+            method = params.pop("method", BaselineMethod.SNIP)
+            baseline = XRDBackground().baseline_batch(x, Y, method, **params)
+        elif op == Operation.PEAKS:
+            signal = Y if baseline is None else Y - baseline
+            peaks = PeakDetector.detect_stack(
+                x, signal, list(range(len(Y))), max_workers=1, noise=noise,
+                **params)
+    return {"x": x, "y": Y, "baseline": baseline, "peaks": peaks}
+
+
+def process_columns(source: str, columns, steps: list[dict]) -> dict:
+    """
+    处理一个文件的数据：第一列为横坐标，其余每列一条扫描。
+
+    :return: run_steps 的结果，另加 source
+    """
+    columns = np.asarray(columns, dtype=float)
+    if columns.ndim != 2 or len(columns) < 2:
+        raise ValueError("File must have at least two columns")
+    result = run_steps(columns[0], columns[1:], steps)
+    result["source"] = source
+    return result
+
+
+def process_upload(source: str, path: str, steps: list[dict]) -> dict:
+    """
+    进程池任务：分块解析暂存在磁盘上的上传文件并处理。
+
+    :param source: 上传时的文件名
+    :param path: 暂存文件的路径
+    """
+    return process_columns(source, read_table(path).T, steps)
+
+
+def process_path(path: str, steps: list[dict], out_dir: str | None = None):
+    """
+    进程池任务：读取并处理一个数据文件，结果写入 out_dir/<文件名>.npz。
+
+    npz 中包含 x、y、（若有）baseline，以及以 peak_ 为前缀的峰表各列。
+
+    :return: (summary, 输出路径)，summary 含 source、n_curves、n_points
+             和 peaks（峰表，无找峰步骤时为 None）
+    """
+    path = Path(path)
+    result = process_columns(path.name, read_table(path).T, steps)
+    out = None
+    if out_dir is not None:
+        out = Path(out_dir) / f"{path.stem}.npz"
+        arrays = {"x": result["x"], "y": result["y"]}
+        if result["baseline"] is not None:
+            arrays["baseline"] = result["baseline"]
+        for key, values in (result["peaks"] or {}).items():
+            # curve_id 为行号，存为整数以便不经 pickle 读取
+            if key == "curve_id":
+                values = np.asarray(values, dtype=np.intp)
+            arrays[f"peak_{key}"] = values
+        np.savez(out, **arrays)
+    n_curves, n_points = result["y"].shape
+    summary = {"source": result["source"], "n_curves": n_curves,
+               "n_points": n_points, "peaks": result["peaks"]}
+    return summary, out
+
+
+def ingest_upload(source: str, data: bytes) -> tuple[np.ndarray, str]:
+    """
+    进程池任务：解析上传的文件，把数据及其峰表记入目录。
+
+    文件 id 取内容的哈希，曲线 id 由文件 id 和列号组成；同样的内容再次上传时
+    直接返回已有的 id，不重复记录，也不重新找峰。
+
+    :return: (columns, file_id)，columns 第一行为横坐标，其余每行一条扫描
+    """
+    columns = read_table(data).T
+    if columns.ndim != 2 or len(columns) < 2:
+        raise ValueError("File must have at least two columns")
+    columns = np.ascontiguousarray(columns)
+
+    file_id = hashlib.sha256(data).hexdigest()[:32]
+    if catalog().has_file(file_id):
+        return columns, file_id
+
+    file = File(source, data=columns)
+    file.id = file_id
+    for i in range(1, len(columns)):
+        curve = Curve(file.x, file.raw_data[i], file.id,
+                      source if len(columns) == 2 else f"{source} [{i}]")
+        curve.id = f"{file.id}-{i}"
+        file.add_curve(curve)
+    # source 只是客户端给出的文件名，不能按服务器上的路径取修改时间
+    catalog().add_file(file, acquired=datetime.now())
+    peaks = PeakDetector.detect_stack(
+        file.x, file.raw_data[1:], list(file.curves), max_workers=1)
+    # 同一内容的两次上传同时到达时，后写入的峰表替换先写入的
+    catalog().add_peaks(peaks, replace=True)
+    return columns, file.id
+
+
+def _peaks_to_json(peaks):
+    if peaks is None:
+        return None
+    return {k: np.asarray(v).tolist() for k, v in peaks.items()}
+
+
+def result_to_json(result: dict) -> dict:
+    """
+    把处理结果转换为可 JSON 序列化的 dict。
+    """
+    return {
+        "source": result["source"],
+        "x": result["x"].tolist(),
+        "y": result["y"].tolist(),
+        "baseline": None if result["baseline"] is None
+        else result["baseline"].tolist(),
+        "peaks": _peaks_to_json(result["peaks"]),
+    }
+
+
+def result_to_frame(result: dict) -> bytes:
+    """
+    把处理结果编码为二进制流中的一条消息。
+
+    数组各行依次为 x、每条扫描处理后的强度、（若有）每条扫描的背景；
+    峰表放在 meta 的 peaks 中。
+    """
+    rows = [result["x"][None], result["y"]]
+    if result["baseline"] is not None:
+        rows.append(result["baseline"])
+    meta = {
+        "source": result["source"],
+        "n_curves": len(result["y"]),
+        "has_baseline": result["baseline"] is not None,
+        "peaks": _peaks_to_json(result["peaks"]),
+    }
+    return encode_frame(np.concatenate(rows), meta)
+
+
+def error_to_frame(source: str, error: str) -> bytes:
+    """
+    处理失败的文件在二进制流中的消息：空数组，meta 中带 error。
+    """
+    return encode_frame(np.empty((0, 0)), {"source": source, "error": error})
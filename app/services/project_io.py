@@ -0,0 +1,256 @@
+# 项目（整个会话）的保存与惰性加载
+import json
+import os
+import struct
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from app.models.curve import Curve
+from app.models.file import File
+from app.services.data_center import DataCenter, data_center
+
+PROJECT_SUFFIX = ".oxrd"
+MANIFEST = "manifest.json"
+_FORMAT_VERSION = 1
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+
+class _ArchiveWriter:
+    """
+    把数组逐个写成不压缩的 .npy 成员。
+    同一块内存上的相同视图（如多条曲线共享的横坐标）只写一次。
+    """
+
+    def __init__(self, zf: zipfile.ZipFile) -> None:
+        self.zf = zf
+        self._written: dict[tuple, str] = {}
+        # 保留数组引用，避免内存在写入期间被释放后复用
+        self._keep: list = []
+
+    def add(self, array, name: str) -> str | None:
+        if array is None:
+            return None
+        data = np.asarray(array)
+        key = (data.__array_interface__["data"], data.shape, data.strides,
+               data.dtype.str)
+        member = self._written.get(key)
+        if member is not None:
+            return member
+
+        member = f"arrays/{name}.npy"
+        if data.dtype == object:
+            data = data.astype(str)
+        with self.zf.open(member, "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, np.ascontiguousarray(data),
+                                      allow_pickle=False)
+        self._written[key] = member
+        self._keep.append(array)
+        return member
+
+
+class _ArchiveReader:
+    """
+    把 ZIP_STORED 成员直接内存映射为数组：只解析本地文件头和 .npy 头，
+    数据在被访问时才由操作系统读入。
+    """
+
+    def __init__(self, path: Path, zf: zipfile.ZipFile) -> None:
+        self.path = path
+        self.zf = zf
+        self._arrays: dict[str, np.ndarray] = {}
+
+    def get(self, member: str | None):
+        if member is None:
+            return None
+        array = self._arrays.get(member)
+        if array is None:
+            array = self._arrays[member] = self._map(member)
+        return array
+
+    def _map(self, member: str) -> np.ndarray:
+        info = self.zf.getinfo(member)
+        if info.compress_type != zipfile.ZIP_STORED:
+            with self.zf.open(member) as f:
+                return np.lib.format.read_array(f, allow_pickle=False)
+
+        with open(self.path, "rb") as f:
+            f.seek(info.header_offset)
+            header = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+            name_len, extra_len = header[-2], header[-1]
+            f.seek(name_len + extra_len, os.SEEK_CUR)
+            if np.lib.format.read_magic(f) == (1, 0):
+                read_header = np.lib.format.read_array_header_1_0
+            else:
+                read_header = np.lib.format.read_array_header_2_0
+            shape, fortran, dtype = read_header(f)
+            offset = f.tell()
+
+        if int(np.prod(shape)) == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=offset,
+                         shape=shape, order="F" if fortran else "C")
+
+
+def save_project(path: Path | str, center: DataCenter | None = None):
+    """
+    把数据中心中的所有文件、曲线、背景、参数和峰表保存为单个项目文件。
+
+    项目文件是不压缩的 zip：manifest.json 记录对象结构和元数据，
+    每个数组是一个 .npy 成员。曲线的原始数据以文件原始数组的列号记录；
+    多条曲线共享的数组（如共同的横坐标）只保存一份。
+    先写临时文件再原子替换。
+
+    :param path: 项目文件路径
+    :param center: 数据中心，默认为全局数据中心
+    """
+    center = center or data_center()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_STORED) as zf:
+            writer = _ArchiveWriter(zf)
+            manifest = {
+                "version": _FORMAT_VERSION,
+                "project": {
+                    "data_type": center.project.data_type,
+                    "x_type": center.project.x_type,
+                    "y_type": center.project.y_type,
+                },
+                "params": center.params,
+                "files": [_file_entry(writer, file)
+                          for file in center.files.values()],
+                "peak_tables": {
+                    name: {col: writer.add(values, f"peaks/{name}/{col}")
+                           for col, values in table.items()}
+                    for name, table in center.peak_tables.items()},
+            }
+            zf.writestr(MANIFEST, json.dumps(manifest, ensure_ascii=False))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _file_entry(writer: _ArchiveWriter, file: File) -> dict:
+    raw = np.asarray(file.raw_data)
+    curves = []
+    for curve in file.curves.values():
+        column = _find_column(raw, curve.raw_y)
+        entry = {
+            "id": curve.id,
+            "label": curve.label,
+            "style": curve.style,
+            "column": column,
+            "raw_y": None if column is not None
+            else writer.add(curve.raw_y, f"{curve.id}/raw_y"),
+            "raw_x": None if _same_view(curve.raw_x, file.x)
+            else writer.add(curve.raw_x, f"{curve.id}/raw_x"),
+            "displayed_x": None if curve.displayed_x is curve.raw_x
+            else writer.add(curve.displayed_x, f"{curve.id}/displayed_x"),
+            "displayed_y": None if curve.displayed_y is curve.raw_y
+            else writer.add(curve.displayed_y, f"{curve.id}/displayed_y"),
+            "baseline": writer.add(curve.baseline, f"{curve.id}/baseline"),
+        }
+        curves.append(entry)
+    return {
+        "id": file.id,
+        "path": str(file.filepath),
+        "raw_x_type": file.raw_x_type,
+        "raw_y_type": file.raw_y_type,
+        "data_type": file.data_type,
+        "wavelength": file.wavelength,
+        "raw_data": writer.add(file.raw_data, f"{file.id}/raw_data"),
+        "curves": curves,
+    }
+
+
+def _same_view(a, b) -> bool:
+    """
+    a 和 b 是否为同一块内存上相同形状和步长的视图。
+    """
+    if not isinstance(a, np.ndarray) or not isinstance(b, np.ndarray):
+        return False
+    return (a.__array_interface__["data"] == b.__array_interface__["data"]
+            and a.shape == b.shape and a.strides == b.strides
+            and a.dtype == b.dtype)
+
+
+def _find_column(raw: np.ndarray, y) -> int | None:
+    """
+    y 是否为 raw 某一行的视图，是则返回行号。
+    """
+    if raw.ndim != 2:
+        return None
+    for i in range(1, len(raw)):
+        if _same_view(raw[i], y):
+            return i
+    return None
+
+
+def load_project(path: Path | str, center: DataCenter | None = None):
+    """
+    打开项目文件，替换数据中心中的当前内容。
+
+    只读取 manifest.json 和各成员的文件头，数组以内存映射方式打开，
+    数据在曲线被显示或计算时才真正读入，因此打开大型项目几乎不占时间和内存。
+    内存映射的数组是只读的。
+
+    :param path: 项目文件路径
+    :param center: 数据中心，默认为全局数据中心
+    """
+    center = center or data_center()
+    path = Path(path)
+    with zipfile.ZipFile(path) as zf:
+        manifest = json.loads(zf.read(MANIFEST))
+        if manifest.get("version", 0) > _FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported project version: {manifest['version']}")
+        reader = _ArchiveReader(path, zf)
+
+        center.begin_batch()
+        for file_id in list(center.files):
+            center.remove_file(file_id)
+        for curve_id in list(center.curves):
+            center.remove_curve(curve_id)
+
+        project = manifest.get("project", {})
+        center.project.data_type = project.get("data_type", "")
+        center.project.x_type = project.get("x_type", "")
+        center.project.y_type = project.get("y_type", "")
+        center.params = dict(manifest.get("params", {}))
+        center.peak_tables = {
+            name: {col: reader.get(member) for col, member in table.items()}
+            for name, table in manifest.get("peak_tables", {}).items()}
+
+        for entry in manifest["files"]:
+            _load_file(reader, center, entry)
+        center.end_batch()
+
+
+def _load_file(reader: _ArchiveReader, center: DataCenter, entry: dict):
+    file = File(entry["path"], data=reader.get(entry["raw_data"]))
+    file.id = entry["id"]
+    file.raw_x_type = entry.get("raw_x_type", "")
+    file.raw_y_type = entry.get("raw_y_type", "")
+    file.data_type = entry.get("data_type", "")
+    file.wavelength = entry.get("wavelength")
+    center.add_file(file)
+
+    for c in entry["curves"]:
+        x = reader.get(c["raw_x"]) if c["raw_x"] is not None else file.x
+        y = file.raw_data[c["column"]] if c["column"] is not None \
+            else reader.get(c["raw_y"])
+        curve = Curve(x, y, file.id, c["label"])
+        curve.id = c["id"]
+        curve.style = c.get("style")
+        if c["displayed_x"] is not None:
+            curve.displayed_x = reader.get(c["displayed_x"])
+        if c["displayed_y"] is not None:
+            curve.displayed_y = reader.get(c["displayed_y"])
+        curve.baseline = reader.get(c["baseline"])
+        center.add_curve(curve, file)
@@ -0,0 +1,178 @@
+# 背景与预处理结果的内容寻址缓存
+import functools
+import hashlib
+import inspect
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ResultCache:
+    """
+    以输入数组内容、方法名和参数的哈希为键的结果缓存。
+
+    内存层按字节数做 LRU 淘汰；指定 disk_dir 时另有磁盘层，
+    结果同时写入 <key>.npy，内存未命中时从磁盘读回。
+    缓存的数组被设为只读，调用方不能原地修改。线程安全。
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 disk_dir: Path | str | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(name: str, params: dict) -> str:
+        """
+        计算缓存键：数组按 dtype、形状和原始字节哈希，列表、元组和字典
+        逐个元素递归哈希，其他参数按 repr。
+        """
+        h = hashlib.blake2b(name.encode("utf-8"), digest_size=20)
+        for key in sorted(params):
+            h.update(key.encode("utf-8"))
+            _hash_value(h, params[key])
+        return h.hexdigest()
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._load_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._insert(key, value)
+        return value
+
+    def put(self, key: str, value: np.ndarray) -> np.ndarray:
+        """
+        存入结果的只读副本并返回该副本。
+
+        不冻结传入的数组本身：它可能是调用方仍持有并会修改的数组，
+        缓存内容也不能随之改变。
+        """
+        value = np.array(value, copy=True)
+        value.flags.writeable = False
+        with self._lock:
+            self._insert(key, value)
+        self._store_disk(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _insert(self, key: str, value: np.ndarray) -> None:
+        if value.nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self._entries[key] = value
+        self.nbytes += value.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def _load_disk(self, key: str) -> np.ndarray | None:
+        if self.disk_dir is None:
+            return None
+        path = self.disk_dir / f"{key}.npy"
+        try:
+            value = np.load(path)
+        except (OSError, ValueError):
+            return None
+        value.flags.writeable = False
+        return value
+
+    def _store_disk(self, key: str, value: np.ndarray) -> None:
+        if self.disk_dir is None:
+            return
+        path = self.disk_dir / f"{key}.npy"
+        if path.exists():
+            return
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, value)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def _hash_value(h, value) -> None:
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        h.update(f"{value.dtype.str}{value.shape}".encode("utf-8"))
+        h.update(memoryview(value).cast("B"))
+    elif isinstance(value, (list, tuple)):
+        # 写入类型和长度，避免不同嵌套结构的元素序列拼出相同的字节
+        h.update(f"{type(value).__name__}{len(value)}".encode("utf-8"))
+        for item in value:
+            _hash_value(h, item)
+    elif isinstance(value, dict):
+        h.update(f"dict{len(value)}".encode("utf-8"))
+        for key in sorted(value, key=repr):
+            h.update(repr(key).encode("utf-8"))
+            _hash_value(h, value[key])
+    else:
+        # 数组的 repr 会截断，不能用于其他类型中嵌套的数组
+        h.update(repr(value).encode("utf-8"))
+
+
+_result_cache = ResultCache(
+    disk_dir=os.environ.get("OPENXRD_RESULT_CACHE_DIR") or None)
+
+
+def result_cache() -> ResultCache:
+    return _result_cache
+
+
+def cached_result(fn):
+    """
+    方法装饰器：按输入数组内容和全部参数（含默认值）缓存返回的数组。
+
+    列表、元组和字典参数逐个元素参与哈希，其中嵌套的数组按内容哈希。
+    """
+    signature = inspect.signature(fn)
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        params = dict(bound.arguments)
+        params.pop("self", None)
+        # **params 形式的参数展开参与哈希
+        for p in signature.parameters.values():
+            if p.kind is inspect.Parameter.VAR_KEYWORD:
+                params.update(params.pop(p.name, {}))
+
+        cache = result_cache()
+        key = cache.make_key(name, params)
+        value = cache.get(key)
+        if value is None:
+            value = cache.put(key, fn(self, *args, **kwargs))
+        return value
+
+    return wrapper
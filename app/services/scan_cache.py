@@ -0,0 +1,97 @@
+# 导入数据的二进制列式缓存
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from app.services.text_parser import read_table
+
+_CACHE_VERSION = 1
+
+
+def default_cache_dir() -> Path:
+    """
+    默认缓存目录，可通过环境变量 OPENXRD_CACHE_DIR 覆盖。
+    """
+    env = os.environ.get("OPENXRD_CACHE_DIR")
+    if env:
+        return Path(env)
+    return Path.home() / ".openxrd" / "cache"
+
+
+class ScanCache:
+    """
+    Binary columnar cache of parsed scan files.
+
+    每个源文件对应缓存目录下的一个 .npy 文件，数组形状为
+    (n_columns, n_points)，C 顺序存储，因此每一列都是连续内存。
+    文件名由源文件的绝对路径、大小和修改时间哈希得到，源文件改动后自动失效。
+    读取时使用内存映射（只读），不会把数据整体载入内存。
+    """
+
+    def __init__(self, cache_dir: Path | str | None = None) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+
+    def key(self, path: Path | str) -> str:
+        path = Path(path).resolve()
+        stat = path.stat()
+        token = f"{_CACHE_VERSION}|{path}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha1(token.encode("utf-8")).hexdigest()
+
+    def cache_path(self, path: Path | str) -> Path:
+        return self.cache_dir / f"{self.key(path)}.npy"
+
+    def load(self, path: Path | str) -> np.ndarray | None:
+        """
+        打开源文件对应的缓存，未命中时返回None。
+
+        :param path: 源文件路径
+        :return: 只读的内存映射数组，shape (n_columns, n_points)
+        """
+        cached = self.cache_path(path)
+        if not cached.exists():
+            return None
+        try:
+            return np.load(cached, mmap_mode="r")
+        except (OSError, ValueError):
+            # 损坏或写了一半的缓存当作未命中
+            return None
+
+    def store(self, path: Path | str, data: np.ndarray) -> np.ndarray:
+        """
+        写入源文件的解析结果并返回其内存映射视图。
+
+        先写临时文件再原子替换，并发导入同一文件时不会读到不完整的缓存。
+
+        :param path: 源文件路径
+        :param data: 解析后的数组，shape (n_columns, n_points)
+        :return: 只读的内存映射数组
+        """
+        cached = self.cache_path(path)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(data, dtype=float))
+            os.replace(tmp, cached)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return np.load(cached, mmap_mode="r")
+
+
+def parse_cached(path: str, cache_dir: str | None):
+    """
+    进程池任务：解析一个数据文件。
+
+    启用缓存时只返回缓存文件路径，由主进程内存映射，避免通过管道回传数组。
+    放在本模块而不是 data_io 中，spawn 出的工作进程无需导入 Qt。
+    """
+    if cache_dir is None:
+        return read_table(path).T
+    cache = ScanCache(cache_dir)
+    if cache.load(path) is None:
+        cache.store(path, read_table(path).T)
+    return str(cache.cache_path(path))
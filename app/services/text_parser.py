@@ -0,0 +1,166 @@
+# 文本衍射数据（.xy/.dat/.txt/.csv）的分块解析
+import io
+import warnings
+from pathlib import Path
+from typing import BinaryIO, Iterator, TextIO
+
+import numpy as np
+
+SUPPORTED_SUFFIXES = (".xy", ".dat", ".txt", ".csv")
+COMMENT_PREFIXES = ("#", "!", "%", "//", "*")
+DELIMITERS = ("\t", ",", ";", None)  # None 表示任意空白
+BLOCK_SIZE = 1 << 20
+SNIFF_SIZE = 1 << 16
+
+
+class TextFormat:
+    """
+    文本数据文件的格式描述：分隔符、表头行数和列数。
+    """
+
+    def __init__(self, delimiter: str | None, header_lines: int,
+                 n_columns: int) -> None:
+        self.delimiter = delimiter
+        self.header_lines = header_lines
+        self.n_columns = n_columns
+
+
+def _split_numeric(line: str, delimiter: str | None) -> list[float] | None:
+    tokens = line.split(delimiter)
+    if delimiter is not None:
+        tokens = [t.strip() for t in tokens]
+        # 允许行尾多余的分隔符
+        while tokens and not tokens[-1]:
+            tokens.pop()
+    try:
+        return [float(t) for t in tokens] if tokens else None
+    except ValueError:
+        return None
+
+
+def sniff_format(lines: list[str]) -> TextFormat:
+    """
+    根据文件开头的若干行推断分隔符、表头行数和列数。
+
+    第一行所有字段都能解析为数字的行视为数据起始行，之前的行（注释、列名、
+    仪器导出的元数据等）都算作表头；分隔符取能把该行拆出最多列的候选。
+
+    :param lines: 文件开头的行（任意可迭代对象）
+    :return: TextFormat
+    """
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped or stripped.startswith(COMMENT_PREFIXES):
+            continue
+        best = None
+        for delimiter in DELIMITERS:
+            values = _split_numeric(stripped, delimiter)
+            if values is not None and (best is None or len(values) > best[1]):
+                best = (delimiter, len(values))
+        if best is not None:
+            return TextFormat(best[0], i, best[1])
+    raise ValueError("No numeric data found")
+
+
+def _parse_lines(lines: list[str], fmt: TextFormat) -> np.ndarray:
+    """
+    用 NumPy 的 C 分词器一次性转换一批数据行，空行和 # 注释被跳过。
+
+    loadtxt 只在单个注释符时走快速路径，其他注释前缀出现在数据区时
+    （很少见）先过滤再重新转换。
+    """
+    with warnings.catch_warnings():
+        # 整块都是注释时 loadtxt 会警告没有数据
+        warnings.simplefilter("ignore", UserWarning)
+        kwargs = dict(dtype=float, delimiter=fmt.delimiter, comments="#",
+                      usecols=range(fmt.n_columns), ndmin=2)
+        try:
+            return np.loadtxt(lines, **kwargs)
+        except ValueError:
+            lines = [line for line in lines
+                     if not line.lstrip().startswith(COMMENT_PREFIXES)]
+            return np.loadtxt(lines, **kwargs)
+
+
+def _open_text(source: Path | str | BinaryIO) -> tuple[TextIO, bool]:
+    if isinstance(source, (str, Path)):
+        return open(source, "r", encoding="latin-1"), True
+    return io.TextIOWrapper(source, encoding="latin-1"), False
+
+
+def iter_blocks(source: Path | str | BinaryIO,
+                block_size: int = BLOCK_SIZE) -> Iterator[np.ndarray]:
+    """
+    分块读取文本数据，逐块产出 shape (n_rows, n_columns) 的数组。
+
+    先从开头推断格式，之后每次读取约 block_size 字节的完整行并整体转换，
+    内存占用与文件大小无关。每块只调用一次 np.loadtxt 的 C 分词器，
+    不超过 block_size 的内容整体一次转换。
+
+    :param source: 文件路径或二进制文件对象
+    :param block_size: 每块读取的字节数
+    """
+    f, owned = _open_text(source)
+    try:
+        lines = f.readlines(SNIFF_SIZE)
+        fmt = sniff_format(lines)
+        # 推断格式读入的行并入第一块，小文件只转换一次
+        lines = lines[fmt.header_lines:] + f.readlines(block_size)
+        while lines:
+            block = _parse_lines(lines, fmt)
+            if block.size:
+                yield block
+            lines = f.readlines(block_size)
+    finally:
+        if owned:
+            f.close()
+        else:
+            # 不关闭调用方传入的文件对象
+            f.detach()
+
+
+def _read_path(path: Path | str) -> np.ndarray:
+    """
+    按推断的格式把整个文件交给 np.loadtxt。
+
+    loadtxt 只在收到路径时才在 C 中按块读取文本；传入行列表或文件对象时
+    要先为每行创建 Python 字符串，慢 40% 以上。文本按块读取，内存占用
+    与 iter_blocks 一样与文件大小无关。不指定 usecols（宽文件上会慢约
+    15%），列数不一致的行使 loadtxt 抛出 ValueError，由调用方改走逐块转换。
+    """
+    with open(path, "r", encoding="latin-1") as f:
+        # 逐行推断，读到第一行数据即停止
+        fmt = sniff_format(f)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return np.loadtxt(path, dtype=float, delimiter=fmt.delimiter,
+                          comments="#", skiprows=fmt.header_lines, ndmin=2,
+                          encoding="latin-1")
+
+
+def read_table(source: Path | str | BinaryIO | bytes,
+               block_size: int = BLOCK_SIZE) -> np.ndarray:
+    """
+    读取整个文本数据文件，返回 shape (n_rows, n_columns) 的数组。
+
+    与 np.loadtxt(path) 的行列布局相同，但会自动识别分隔符并跳过表头。
+    对路径的读取与格式已知时直接调用 np.loadtxt 一样快；
+    数据区中出现 # 以外的注释前缀时改为逐块过滤后转换。
+
+    :param source: 文件路径、二进制文件对象或文件内容
+    :param block_size: 每块读取的字节数
+    """
+    if isinstance(source, (str, Path)):
+        try:
+            table = _read_path(source)
+        except ValueError:
+            pass
+        else:
+            if table.size:
+                return table
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    blocks = list(iter_blocks(source, block_size))
+    if not blocks:
+        raise ValueError("No numeric data found")
+    return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
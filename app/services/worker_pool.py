@@ -0,0 +1,141 @@
+# API 服务的有界计算进程池
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable
+
+DEFAULT_MAX_PENDING = 256
+
+
+def default_workers() -> int:
+    """
+    进程池大小，可通过环境变量 OPENXRD_WORKERS 覆盖，默认为 CPU 核数。
+    """
+    env = os.environ.get("OPENXRD_WORKERS")
+    if env:
+        return max(1, int(env))
+    return os.cpu_count() or 1
+
+
+def default_max_pending() -> int:
+    """
+    排队任务上限，可通过环境变量 OPENXRD_MAX_PENDING 覆盖。
+    """
+    env = os.environ.get("OPENXRD_MAX_PENDING")
+    if env:
+        return max(1, int(env))
+    return DEFAULT_MAX_PENDING
+
+
+class PoolBusy(RuntimeError):
+    """
+    排队任务已满，请求应被拒绝（HTTP 429）并稍后重试。
+    """
+
+
+class WorkerPool:
+    """
+    解析和计算任务的进程池，事件循环只负责收发数据。
+
+    已提交但尚未完成的任务数不超过 max_pending，超过时 submit 直接抛出
+    PoolBusy 而不是无限排队，上传高峰时内存和延迟都有上界。
+    工作进程用 spawn 方式启动，与 GUI 线程或 uvicorn 的线程共存时也安全；
+    进程池在第一次提交时才创建。
+    """
+
+    def __init__(self, max_workers: int | None = None,
+                 max_pending: int | None = None) -> None:
+        self.max_workers = max_workers or default_workers()
+        self.max_pending = max_pending or default_max_pending()
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def submit(self, fn: Callable, *args) -> asyncio.Future:
+        """
+        在进程池中执行 fn(*args)，须在事件循环中调用。
+        """
+        return self.submit_many(fn, [args])[0]
+
+    def submit_many(self, fn: Callable,
+                    args_list: Iterable[tuple]) -> list[asyncio.Future]:
+        """
+        批量提交 fn(*args)：要么全部入队，要么在队列放不下时整体拒绝。
+
+        :raises PoolBusy: 排队任务数将超过 max_pending
+        """
+        args_list = list(args_list)
+        n = len(args_list)
+        with self._lock:
+            if self._pending + n > self.max_pending:
+                raise PoolBusy(
+                    f"Server busy: {self._pending} tasks pending, "
+                    f"limit {self.max_pending}")
+            self._pending += n
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        try:
+            for args in args_list:
+                future = self._submit(fn, args)
+                # 在进程池的 future 完成时才释放名额：asyncio future 被取消
+                # （如客户端断开）时已在运行的任务仍会占用工作进程
+                future.add_done_callback(self._release)
+                futures.append(asyncio.wrap_future(future, loop=loop))
+        except BaseException:
+            with self._lock:
+                self._pending -= n - len(futures)
+            raise
+        return futures
+
+    def _submit(self, fn, args) -> Future:
+        executor = self.executor
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # 工作进程异常退出后进程池不可再用，换一个新的
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            return self.executor.submit(fn, *args)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+_worker_pool: WorkerPool | None = None
+_worker_pool_lock = threading.Lock()
+
+
+def worker_pool() -> WorkerPool:
+    """
+    全局进程池，首次调用时按环境变量配置创建。
+    """
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = WorkerPool()
+        return _worker_pool
@@ -1,12 +1,25 @@
 # app.py
-import pandas as pd
-import numpy as np
-from fastapi import FastAPI, File, UploadFile
+import asyncio
+import json
+import os
+import tempfile
+
+from fastapi import FastAPI, File, Form, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.services.array_transport import (MEDIA_TYPE, STREAM_MEDIA_TYPE,
+                                          encode_arrays)
+from app.services.catalog import catalog
+from app.services.processing import (Operation, error_to_frame,
+                                     ingest_upload, process_upload,
+                                     result_to_frame, result_to_json,
+                                     validate_steps)
+from app.services.text_parser import BLOCK_SIZE
+from app.services.worker_pool import PoolBusy, worker_pool
 
 app = FastAPI()
-database = []  # 模拟内存数据库
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # 桌面端和后端同机，直接放开
@@ -15,22 +28,194 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(PoolBusy)
+async def pool_busy(request: Request, exc: PoolBusy):
+    return JSONResponse({"detail": str(exc)}, status_code=429,
+                        headers={"Retry-After": "1"})
+
+
 @app.post("/upload_csv")
-async def upload_csv(file: UploadFile = File(...)):
-    data = np.loadtxt(file.file)
+async def upload_csv(request: Request, file: UploadFile = File(...)):
+    # 解析、入库和找峰都在进程池中进行，事件循环只读取上传内容
+    data = await file.read()
+    try:
+        columns, file_id = await worker_pool().submit(
+            ingest_upload, file.filename, data)
+    except ValueError as e:
+        raise HTTPException(400, f"Cannot parse file: {e}")
 
-    if data.ndim != 2 or data.shape[1] < 2:
-        raise HTTPException(400, "File must have at least two columns")
+    meta = {
+        "source": file.filename,
+        "file_id": file_id,
+        "x_label": "2θ (deg)",
+        "y_label": "Intensity (a.u.)"
+    }
 
-    x = data[:, 0]
-    y = data[:, 1]
+    # 客户端声明接受二进制时返回所有列的原始 float64 数据
+    if MEDIA_TYPE in request.headers.get("accept", ""):
+        return Response(encode_arrays(columns, meta), media_type=MEDIA_TYPE)
+
+    x = columns[0]
+    y = columns[1]
 
     return {
         "x": x.tolist(),
         "y": y.tolist(),
-        "meta": {
-            "source": file.filename,
-            "x_label": "2θ (deg)",
-            "y_label": "Intensity (a.u.)"
-        }
+        "meta": meta
     }
+
+
+@app.get("/catalog/files")
+def find_files(sample: str | None = None, acquired_from: str | None = None,
+               acquired_to: str | None = None, limit: int = 1000,
+               pattern: bool = False):
+    return catalog().find_files(sample, acquired_from, acquired_to, limit,
+                                pattern=pattern)
+
+
+@app.get("/catalog/peaks")
+def find_peaks(two_theta_min: float, two_theta_max: float,
+               limit: int = 100000):
+    return catalog().find_peaks(two_theta_min, two_theta_max, limit)
+
+
+@app.get("/catalog/curves/{curve_id}/peaks")
+def curve_peaks(curve_id: str):
+    return catalog().curve_peaks(curve_id)
+
+
+def _parse_json(text: str | None, default):
+    """
+    解析表单中的 JSON 字段，类型须与 default 相同。
+    """
+    if not text:
+        return default
+    try:
+        value = json.loads(text)
+    except ValueError as e:
+        raise HTTPException(400, f"Invalid JSON: {e}")
+    if not isinstance(value, type(default)):
+        raise HTTPException(400, f"Expected JSON {type(default).__name__}")
+    return value
+
+
+async def _spool(file: UploadFile) -> str:
+    """
+    把上传内容分块写入临时文件，返回路径，由工作进程从磁盘分块解析。
+    """
+    fd, path = tempfile.mkstemp(prefix="openxrd-upload-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await file.read(BLOCK_SIZE):
+                await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    finally:
+        await file.close()
+    return path
+
+
+def _remove(paths):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+async def _stream_results(request: Request, files: list[UploadFile],
+                          steps: list[dict]) -> StreamingResponse:
+    """
+    在进程池中逐个处理上传的文件，按完成顺序流式返回结果。
+
+    上传内容先暂存到临时文件，不整体读入内存；处理完成后删除。
+    默认每个文件一行 JSON（NDJSON），失败的文件为 {"source", "error"}；
+    客户端声明接受 STREAM_MEDIA_TYPE 时每个文件一条二进制消息，
+    失败的文件为空数组加 meta 中的 error。
+    """
+    try:
+        steps = validate_steps(steps)
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+    binary = STREAM_MEDIA_TYPE in request.headers.get("accept", "")
+
+    paths = []
+    try:
+        for file in files:
+            paths.append(await _spool(file))
+        # 整批入队，队列放不下时在开始流式响应之前返回 429
+        tasks = worker_pool().submit_many(
+            process_upload, [(file.filename, path, steps)
+                             for file, path in zip(files, paths)])
+    except BaseException:
+        _remove(paths)
+        raise
+
+    async def body():
+        pending = {task: (file.filename, path)
+                   for task, file, path in zip(tasks, files, paths)}
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source, path = pending.pop(task)
+                    _remove([path])
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        if binary:
+                            yield error_to_frame(source, str(e))
+                        else:
+                            yield _ndjson({"source": source, "error": str(e)})
+                        continue
+                    if binary:
+                        yield result_to_frame(result)
+                    else:
+                        yield _ndjson(result_to_json(result))
+        finally:
+            # 客户端断开时取消尚未开始的任务
+            for task in pending:
+                task.cancel()
+            _remove(path for _, path in pending.values())
+
+    media_type = STREAM_MEDIA_TYPE if binary else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
+
+
+def _ndjson(obj) -> bytes:
+    return (json.dumps(obj) + "\n").encode("utf-8")
+
+
+@app.post("/process")
+async def process(request: Request, files: list[UploadFile] = File(...),
+                  steps: str = Form("[]")):
+    """
+    按 steps（JSON 列表，见 processing.validate_steps）处理一个或多个文件。
+    """
+    return await _stream_results(request, files, _parse_json(steps, []))
+
+
+@app.post("/baseline")
+async def baseline(request: Request, files: list[UploadFile] = File(...),
+                   method: str = Form("snip"), params: str = Form("{}")):
+    step = {"method": method, **_parse_json(params, {}),
+            "op": Operation.BASELINE}
+    return await _stream_results(request, files, [step])
+
+
+@app.post("/smooth")
+async def smooth(request: Request, files: list[UploadFile] = File(...),
+                 method: str = Form("savgol"), window: int = Form(11),
+                 poly: int = Form(3)):
+    step = {"op": Operation.SMOOTH, "method": method, "window": window,
+            "poly": poly}
+    return await _stream_results(request, files, [step])
+
+
+@app.post("/peaks")
+async def peaks(request: Request, files: list[UploadFile] = File(...),
+                params: str = Form("{}")):
+    step = {**_parse_json(params, {}), "op": Operation.PEAKS}
+    return await _stream_results(request, files, [step])
@@ -0,0 +1,60 @@
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+class ArrayTableModel(QAbstractTableModel):
+    """
+    直接以 NumPy 列数组为数据源的只读表格模型。
+
+    不为单元格创建任何对象，视图请求某个可见单元格时才格式化对应的值，
+    多列文件的所有列共用同一个模型。
+    """
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._columns: list[np.ndarray] = []
+        self._labels: list[str] = []
+        self._rows = 0
+
+    def set_columns(self, columns, labels: list[str] | None = None):
+        """
+        替换表格数据。
+
+        :param columns: 一维数组序列或 shape (n_columns, n_points) 的二维数组，
+                        列数组不会被复制
+        :param labels: 列名，默认为 x, y1, y2...
+        """
+        self.beginResetModel()
+        self._columns = [np.asarray(c) for c in columns]
+        self._rows = max((len(c) for c in self._columns), default=0)
+        if labels is None:
+            labels = default_labels(len(self._columns))
+        self._labels = list(labels)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        column = self._columns[index.column()]
+        if index.row() >= len(column):
+            return None
+        return str(column[index.row()].item())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._labels[section]
+        return str(section + 1)
+
+
+def default_labels(n_columns: int) -> list[str]:
+    if n_columns == 2:
+        return ["x", "y"]
+    return ["x"] + [f"y{i}" for i in range(1, n_columns)]
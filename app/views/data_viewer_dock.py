@@ -1,5 +1,6 @@
-from PySide6.QtWidgets import QDockWidget, QTableWidgetItem
+from PySide6.QtWidgets import QDockWidget, QHeaderView
 
+from app.views.data_table_model import ArrayTableModel
 from app.views.ui.dataDock_ui import Ui_dataViewerDock
 
 
@@ -10,19 +11,14 @@ class DataViewerDock(QDockWidget):
 
         self._ui.setupUi(self)
 
-        self.table = self._ui.tableWidget
+        self.model = ArrayTableModel(self)
+        self.table = self._ui.tableView
+        self.table.setModel(self.model)
+        # 固定行高，视图无需逐行测量
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
     def show_table(self, data: dict):
-        columns = ["x", "y"]
-        x = data['x']
-        y = data['y']
-
-        self.table.setColumnCount(2)
-        self.table.setRowCount(len(x))
-        self.table.setHorizontalHeaderLabels(columns)
-
-        for i in range(len(x)):
-            self.table.setItem(
-                i, 0, QTableWidgetItem(str(x[i])))
-            self.table.setItem(
-                i, 1, QTableWidgetItem(str(y[i])))
+        columns = data.get("columns")
+        if columns is None:
+            columns = [data['x'], data['y']]
+        self.model.set_columns(columns)
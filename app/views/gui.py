@@ -9,9 +9,9 @@ from app.core.window_controller import WindowController
 API_URL = "http://127.0.0.1:8000"
 
 
-def run_gui():
+def run_gui(api_url: str = API_URL):
     app = QApplication(sys.argv)
-    win = MainWindow()
+    win = MainWindow(api_url)
     main_controller = WindowController(main_window=win)
     main_controller.show_window()
     sys.exit(app.exec())
@@ -3,15 +3,19 @@
 from pathlib import Path
 
 import numpy as np
-import requests
 from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QAction
-from PySide6.QtWidgets import (QDialog, QFileDialog, QMainWindow,
+from PySide6.QtGui import QAction, QActionGroup
+from PySide6.QtWidgets import (QApplication, QDialog, QFileDialog,
+                               QMainWindow, QProgressDialog,
                                QTableWidgetItem, QVBoxLayout)
 
+from app.models.axis_types import XType
 from app.models.curve import Curve
 from app.models.file import File
+from app.services.array_transport import MEDIA_TYPE, decode_arrays
 from app.services.data_center import data_center
+from app.services.data_io import DataIO
+from app.services.project_io import PROJECT_SUFFIX, load_project, save_project
 from app.views.data_viewer_dock import DataViewerDock
 from app.views.dialogs.baseline_dialog import BaselineDialog
 from app.views.dialogs.import_config_dialog import ImportConfigDialog
@@ -25,13 +29,15 @@ class MainWindow(QMainWindow):
     signal_csv_uploaded = Signal(dict)
     signal_calculate_baseline = Signal()
 
-    def __init__(self):
+    def __init__(self, api_url: str = "http://127.0.0.1:8000"):
         super().__init__()
         self.setWindowTitle("OpenXRD")
+        self.api_url = api_url.rstrip("/")
         self._ui = Ui_MainWindow()
         self._ui.setupUi(self)
 
         self.data_center = data_center()
+        self.data_io = DataIO()
 
         self.setContextMenuPolicy(Qt.CustomContextMenu)
 
@@ -64,6 +70,16 @@ class MainWindow(QMainWindow):
         actionImport = QAction("Import File(s)...", self)
         actionImport.triggered.connect(self.import_csv)
         fileMenu.addAction(actionImport)
+        actionImportFolder = QAction("Import Folder...", self)
+        actionImportFolder.triggered.connect(self.import_folder)
+        fileMenu.addAction(actionImportFolder)
+        fileMenu.addSeparator()
+        actionOpenProject = QAction("Open Project...", self)
+        actionOpenProject.triggered.connect(self.open_project)
+        fileMenu.addAction(actionOpenProject)
+        actionSaveProject = QAction("Save Project As...", self)
+        actionSaveProject.triggered.connect(self.save_project)
+        fileMenu.addAction(actionSaveProject)
 
         # View menu
         self.menuBar().addMenu("View")
@@ -81,6 +97,17 @@ class MainWindow(QMainWindow):
         actionViewExplorer.toggled.connect(self.fileDock.setVisible)
         viewMenu.addAction(actionViewExplorer)
 
+        xAxisMenu = viewMenu.addMenu("X Axis")
+        xAxisGroup = QActionGroup(self)
+        for x_type in (XType.TWO_THETA, XType.D_SPACING, XType.Q):
+            action = QAction(x_type, self)
+            action.setCheckable(True)
+            action.setChecked(x_type == self.canvas.x_type)
+            action.triggered.connect(
+                lambda checked, t=x_type: self.canvas.set_x_type(t))
+            xAxisGroup.addAction(action)
+            xAxisMenu.addAction(action)
+
         # Tools menu
         toolsMenu = self.menuBar().addMenu("Tools")
         actionBaseline = QAction("Baseline", self)
@@ -93,24 +120,78 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
 
+        import requests
+
         with open(file_path, 'rb') as f:
             response = requests.post(
-                "http://127.0.0.1:8000/upload_csv", files={"file": f})
+                f"{self.api_url}/upload_csv", files={"file": f},
+                headers={"Accept": f"{MEDIA_TYPE}, application/json"})
         if response.status_code == 200:
-            data = response.json()
+            if response.headers.get("content-type") == MEDIA_TYPE:
+                columns, meta = decode_arrays(response.content)
+                data = {"x": columns[0], "y": columns[1],
+                        "columns": columns, "meta": meta}
+            else:
+                data = response.json()
             self.signal_csv_uploaded.emit(data)
 
+    def import_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "选择数据文件夹")
+        if not folder:
+            return
+
+        progress = QProgressDialog("Importing files...", "Cancel", 0, 0, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+
+        def on_progress(done, total):
+            progress.setMaximum(total)
+            progress.setValue(done)
+            QApplication.processEvents()
+
+        self.data_io.import_folder(folder, progress=on_progress,
+                                   cancelled=progress.wasCanceled)
+        progress.close()
+
+    def open_project(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "打开项目", "", f"OpenXRD Project (*{PROJECT_SUFFIX})")
+        if path:
+            load_project(path)
+
+    def save_project(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "保存项目", "", f"OpenXRD Project (*{PROJECT_SUFFIX})")
+        if not path:
+            return
+        if not path.endswith(PROJECT_SUFFIX):
+            path += PROJECT_SUFFIX
+        save_project(path)
+
     def on_file_uploaded(self, data: dict):
-        x = np.asarray(data["x"], dtype=float)
-        y = np.asarray(data["y"], dtype=float)
+        columns = data.get("columns")
+        if columns is None:
+            columns = np.asarray([data["x"], data["y"]], dtype=float)
 
         config_dialog = ImportConfigDialog(self)
 
         config_dialog.exec()
-
-        curve = Curve(x, y, data["meta"]["source"], data["meta"]["source"])
-        file = File(data["meta"]["source"])
-        self.data_center.add_curve(curve, file)
+        config = config_dialog.get_import_config()
+
+        source = data["meta"]["source"]
+        file = File(source, data=columns)
+        file.raw_x_type = config.x_type
+        file.wavelength = config.wavelength
+        x = file.x
+        n_curves = len(columns) - 1
+
+        self.data_center.begin_batch()
+        self.data_center.add_file(file)
+        for i in range(n_curves):
+            label = source if n_curves == 1 else f"{source} [{i+1}]"
+            curve = Curve(x, columns[i+1], file.id, label)
+            self.data_center.add_curve(curve, file)
+        self.data_center.end_batch()
 
         # self.signal_plot_curve.emit(curve)
 
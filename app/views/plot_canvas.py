@@ -1,15 +1,88 @@
+import numpy as np
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QWidget, QVBoxLayout
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt import \
     NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
 
+from app.core.decimation import MinMaxPyramid, visible_range
 from app.models.axis_types import XType, YType
 from app.models.curve import Curve
-from app.services.data_center import data_center
+from app.services.axis_service import axis_service
+from app.services.data_center import CurveField, Delta, data_center
+
+MAX_LEGEND_ENTRIES = 20
+
+
+class _CurveArtists:
+    """
+    一条曲线对应的 Line2D、绘制时使用的数组引用（用于判断数据是否变化），
+    以及曲线和背景的最小/最大值金字塔。
+
+    source_x 为曲线的横坐标，x 为其按当前坐标类型转换后的结果；
+    金字塔只依赖纵坐标，切换坐标类型时无需重建。
+    金字塔在第一次需要抽稀时才构建，加入画布本身不读取整条曲线，
+    内存映射的工程数据仍按需加载。
+    """
+
+    def __init__(self, line, source_x, x, y) -> None:
+        self.line = line
+        self.baseline_line = None
+        self.baseline = None
+        # "y" 和 "baseline" 对应的金字塔，数据变化时丢弃
+        self._pyramids: dict[str, MinMaxPyramid] = {}
+        self.set_data(source_x, x, y)
+
+    def set_data(self, source_x, x, y):
+        self.source_x = source_x
+        self.x = x
+        self.y = y
+        self._pyramids.pop("y", None)
+
+    def set_baseline(self, baseline):
+        self.baseline = baseline
+        self._pyramids.pop("baseline", None)
+
+    def _indices(self, key, y, i0, i1, n_bins):
+        """
+        [i0, i1) 内抽稀后保留的索引；点数不需要抽稀时不构建金字塔。
+        """
+        if i1 - i0 <= 2 * n_bins:
+            return np.arange(i0, i1)
+        pyramid = self._pyramids.get(key)
+        if pyramid is None:
+            pyramid = self._pyramids[key] = MinMaxPyramid(y)
+        return pyramid.indices(i0, i1, n_bins)
+
+    def apply_view(self, lo, hi, n_bins):
+        """
+        按可见范围和像素宽度抽稀后更新 Line2D 的数据。
+        """
+        x = np.asarray(self.x)
+        i0, i1 = visible_range(x, lo, hi)
+        idx = self._indices("y", self.y, i0, i1, n_bins)
+        self.line.set_data(x[idx], np.asarray(self.y)[idx])
+        if self.baseline_line is not None:
+            idx = self._indices("baseline", self.baseline, i0, i1, n_bins)
+            self.baseline_line.set_data(x[idx], np.asarray(self.baseline)[idx])
 
 
 class PlotCanvas(QWidget):
+    """
+    曲线画布。
+
+    每条曲线的 Line2D 按曲线 id 保存，数据变化时只调用 set_data 更新；
+    同一事件循环内的多次变化合并为一次重绘，且只处理 curvesUpdated 通知中
+    新增、修改或移除的曲线。背景线为 animated 艺术家，
+    仅背景变化时通过 blit 重绘，不重新渲染整个坐标系。
+
+    交给 matplotlib 的数据按坐标轴像素宽度抽稀（保留每个像素桶的极值），
+    缩放、平移或改变窗口大小时重新抽稀。
+
+    横坐标可在 2θ、d、Q 之间切换，转换结果由 axis_service 按文件共享缓存。
+    """
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -28,48 +101,240 @@ class PlotCanvas(QWidget):
         layout.addWidget(self.canvas)
         self.setLayout(layout)
 
+        self._artists: dict[str, _CurveArtists] = {}
+        self._background = None
+        self._redraw_pending = False
+        self._full_sync = False
+        self._pending = Delta()
+        self.x_type = XType.TWO_THETA
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas.mpl_connect("resize_event", self._update_lod)
+        self.ax.callbacks.connect("xlim_changed", self._update_lod)
+
         self.data_center = data_center()
-        self.data_center.curvesChanged.connect(self.plot_curves)
+        self.data_center.curvesUpdated.connect(self.on_curves_updated)
 
     def clear(self):
         """清空画布"""
         self.ax.clear()
-        self.ax.set_xlabel("2θ (deg)")
-        self.ax.set_ylabel("Intensity (a.u.)")
+        self.ax.callbacks.connect("xlim_changed", self._update_lod)
+        self._artists.clear()
+        self._background = None
+        self.ax.set_xlabel(self.x_type)
+        self.ax.set_ylabel(YType.INTENSITY)
         self.ax.grid(True, alpha=0.3)
         self.canvas.draw_idle()
 
+    def set_x_type(self, x_type: str):
+        """
+        切换横坐标类型（XType），只替换各曲线的横坐标数组，不重建金字塔。
+        """
+        if x_type == self.x_type:
+            return
+        self.x_type = x_type
+        for curve_id, artists in self._artists.items():
+            curve = self.data_center.curves.get(curve_id)
+            if curve is not None:
+                artists.x = self._plot_x(curve)
+        self.ax.set_xlabel(x_type)
+        self._autoscale()
+        self.canvas.draw_idle()
+
+    def _plot_x(self, curve: Curve):
+        """
+        曲线按当前坐标类型的横坐标。
+        """
+        file = self.data_center.files.get(curve.file_id)
+        from_type = file.raw_x_type if file is not None else ""
+        wavelength = file.wavelength if file is not None else None
+        return axis_service().convert(curve.displayed_x, from_type,
+                                      self.x_type, wavelength)
+
+    def on_curves_updated(self, delta: Delta):
+        """
+        累积数据中心的变化，在下一次事件循环中只同步这些曲线。
+        """
+        self._pending.merge(delta)
+        self._schedule()
+
+    def schedule_redraw(self):
+        """
+        在下一次事件循环中同步全部曲线，期间的多次调用只触发一次重绘。
+        """
+        self._full_sync = True
+        self._schedule()
+
+    def _schedule(self):
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            QTimer.singleShot(0, self._flush)
+
+    def _flush(self):
+        self._redraw_pending = False
+        if self._full_sync:
+            self.plot_curves()
+            return
+        delta, self._pending = self._pending, Delta()
+        curves = self.data_center.curves
+
+        full_redraw = False
+        for curve_id in delta.removed:
+            if curve_id in self._artists:
+                self._remove_artists(curve_id)
+                full_redraw = True
+        for curve_id, fields in delta.changed.items():
+            # 样式变化时重建艺术家
+            if CurveField.STYLE in fields and curve_id in self._artists:
+                self._remove_artists(curve_id)
+
+        baseline_changed = False
+        for curve_id in delta.ids():
+            curve = curves.get(curve_id)
+            if curve is None:
+                continue
+            full, blit = self._sync_curve(curve)
+            full_redraw = full_redraw or full
+            baseline_changed = baseline_changed or blit
+        self._finish(full_redraw, baseline_changed)
+
     def plot_curves(self):
         """
-        画多条曲线
-        :param curves: 曲线列表
+        将画布与数据中心的全部曲线同步：新增、更新或移除对应的 Line2D。
         """
-        curves = self.data_center.curves.values()
+        self._redraw_pending = False
+        self._full_sync = False
+        self._pending = Delta()
+        curves = self.data_center.curves
 
-        for curve in curves:
-            self.plot_curve(curve)
+        full_redraw = False
+        for curve_id in list(self._artists):
+            if curve_id not in curves:
+                self._remove_artists(curve_id)
+                full_redraw = True
 
-        self.canvas.draw_idle()
+        baseline_changed = False
+        for curve in curves.values():
+            full, blit = self._sync_curve(curve)
+            full_redraw = full_redraw or full
+            baseline_changed = baseline_changed or blit
+        self._finish(full_redraw, baseline_changed)
+
+    def _finish(self, full_redraw, baseline_changed):
+        if full_redraw:
+            self._refresh_layout()
+            self.canvas.draw_idle()
+        elif baseline_changed:
+            self._blit()
 
     def plot_curve(self, curve: Curve, clear=True):
         """
         画一条曲线
-        :param x: array-like
-        :param y: array-like
-        :param label: 曲线名
+        :param curve: 曲线
         :param clear: 是否先清空再画
         """
         if clear:
             self.clear()
 
-        self.ax.plot(curve.displayed_x, curve.displayed_y,
-                     label=curve.label, **curve.style if curve.style else {})
+        self._sync_curve(curve)
+        self._refresh_layout()
+        self.canvas.draw_idle()
 
-        if curve.baseline is not None:
-            self.ax.plot(curve.displayed_x, curve.baseline,
-                         label=f"{curve.label} baseline", **curve.style if curve.style else {})
+    def _sync_curve(self, curve: Curve):
+        """
+        创建或更新曲线的艺术家。
 
-        if curve.label:
-            self.ax.legend()
+        :return: (是否需要完整重绘, 是否仅背景线数据变化)
+        """
+        style = curve.style if curve.style else {}
+        artists = self._artists.get(curve.id)
+        full_redraw = False
 
-        self.canvas.draw_idle()
+        if artists is None:
+            line, = self.ax.plot([], [], label=curve.label, **style)
+            artists = _CurveArtists(line, curve.displayed_x,
+                                    self._plot_x(curve), curve.displayed_y)
+            self._artists[curve.id] = artists
+            full_redraw = True
+        elif artists.source_x is not curve.displayed_x \
+                or artists.y is not curve.displayed_y:
+            artists.set_data(curve.displayed_x, self._plot_x(curve),
+                             curve.displayed_y)
+            full_redraw = True
+
+        if artists.baseline is curve.baseline:
+            return full_redraw, False
+
+        artists.set_baseline(curve.baseline)
+        if curve.baseline is None:
+            artists.baseline_line.remove()
+            artists.baseline_line = None
+            return True, False
+        if artists.baseline_line is None:
+            artists.baseline_line, = self.ax.plot(
+                [], [], label=f"{curve.label} baseline", animated=True,
+                **style)
+            return True, False
+
+        lo, hi = sorted(self.ax.get_xlim())
+        artists.apply_view(lo, hi, self._n_bins())
+        return full_redraw, True
+
+    def _remove_artists(self, curve_id):
+        artists = self._artists.pop(curve_id)
+        artists.line.remove()
+        if artists.baseline_line is not None:
+            artists.baseline_line.remove()
+
+    def _n_bins(self):
+        return max(int(self.ax.bbox.width), 100)
+
+    def _update_lod(self, *args):
+        """
+        坐标范围或画布大小变化时，按新的可见范围重新抽稀所有曲线。
+        """
+        lo, hi = sorted(self.ax.get_xlim())
+        n_bins = self._n_bins()
+        for artists in self._artists.values():
+            artists.apply_view(lo, hi, n_bins)
+
+    def _autoscale(self):
+        # 先用全范围抽稀结果计算数据范围（保留了全局极值），再按视图抽稀
+        n_bins = self._n_bins()
+        for artists in self._artists.values():
+            artists.apply_view(-np.inf, np.inf, n_bins)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self._update_lod()
+
+    def _refresh_layout(self):
+        self._autoscale()
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        n_labels = sum(bool(a.line.get_label())
+                       for a in self._artists.values())
+        # 图例条目过多时既看不清又占去大部分绘制时间，因此不显示；
+        # loc="best" 要扫描所有数据点，曲线多时非常慢
+        if 0 < n_labels <= MAX_LEGEND_ENTRIES:
+            self.ax.legend(loc="upper right")
+
+    def _animated_lines(self):
+        return [a.baseline_line for a in self._artists.values()
+                if a.baseline_line is not None]
+
+    def _on_draw(self, event):
+        """
+        完整绘制后保存不含背景线的画面，再把背景线画到同一缓冲区上。
+        """
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for line in self._animated_lines():
+            self.ax.draw_artist(line)
+
+    def _blit(self):
+        if self._background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        for line in self._animated_lines():
+            self.ax.draw_artist(line)
+        self.canvas.blit(self.ax.bbox)
@@ -16,7 +16,7 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QApplication, QDockWidget, QHeaderView, QSizePolicy,
-    QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget)
+    QTableView, QVBoxLayout, QWidget)
 
 class Ui_dataViewerDock(object):
     def setupUi(self, dataViewerDock):
@@ -27,10 +27,10 @@ class Ui_dataViewerDock(object):
         self.dockWidgetContents.setObjectName(u"dockWidgetContents")
         self.verticalLayout = QVBoxLayout(self.dockWidgetContents)
         self.verticalLayout.setObjectName(u"verticalLayout")
-        self.tableWidget = QTableWidget(self.dockWidgetContents)
-        self.tableWidget.setObjectName(u"tableWidget")
+        self.tableView = QTableView(self.dockWidgetContents)
+        self.tableView.setObjectName(u"tableView")
 
-        self.verticalLayout.addWidget(self.tableWidget)
+        self.verticalLayout.addWidget(self.tableView)
 
         dataViewerDock.setWidget(self.dockWidgetContents)
 
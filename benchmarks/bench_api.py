@@ -0,0 +1,25 @@
+# /upload_csv 的完整往返：上传、进程池中解析入库找峰、返回结果
+from fastapi.testclient import TestClient
+
+from harness import ROOT, benchmark
+
+from app.services.array_transport import MEDIA_TYPE
+from app.views.app import app
+
+SAMPLE = ROOT / "data" / "LaB6_Cu_Ka1.dat"
+ACCEPT = {"json": "application/json", "binary": f"{MEDIA_TYPE}, "
+          "application/json"}
+
+
+@benchmark("api.upload_csv", accept=list(ACCEPT))
+def upload_csv(accept):
+    client = TestClient(app)
+    content = SAMPLE.read_bytes()
+    headers = {"Accept": ACCEPT[accept]}
+
+    def upload():
+        response = client.post("/upload_csv", headers=headers,
+                               files={"file": (SAMPLE.name, content)})
+        response.raise_for_status()
+
+    return upload
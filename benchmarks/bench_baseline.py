@@ -0,0 +1,61 @@
+# XRDBackground 各方法在不同数据长度下的耗时
+import numpy as np
+
+from datasets import synthetic_scan
+from harness import benchmark
+
+from app.core.baseline import XRDBackground
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# 方法名 -> 由 (x, y) 组成参数的函数
+METHODS = {
+    "baseline_snip": lambda x, y: (y,),
+    "baseline_als": lambda x, y: (y,),
+    "baseline_poly": lambda x, y: (x, y),
+    "baseline_rolling_ball": lambda x, y: (y,),
+    "baseline_modpoly": lambda x, y: (x, y),
+    "baseline_anchor": lambda x, y: (x, y, [(x[0], y[0]), (x[len(x) // 2],
+                                             y[len(y) // 2]), (x[-1], y[-1])]),
+    "asls_baseline": lambda x, y: (y,),
+    "calculate_baseline": lambda x, y: (x, y),
+    "smooth_savgol": lambda x, y: (y,),
+    "savgol_smoothing": lambda x, y: (x, y, 11, 3),
+    "medfilt_smoothing": lambda x, y: (y,),
+}
+
+
+def _uncached(name):
+    # 绕过 cached_result，测量算法本身而不是缓存命中
+    method = getattr(XRDBackground, name)
+    return getattr(method, "__wrapped__", method)
+
+
+def _register(name, make_args):
+    @benchmark(f"baseline.{name}", n=SIZES)
+    def setup(n):
+        x, y = synthetic_scan(n)
+        fn, args, bg = _uncached(name), make_args(x, y), XRDBackground()
+        return lambda: fn(bg, *args)
+
+
+for _name, _make_args in METHODS.items():
+    _register(_name, _make_args)
+
+
+@benchmark("baseline.cache_hit", n=SIZES)
+def cache_hit(n):
+    # 缓存命中的开销主要是对输入内容求哈希
+    x, y = synthetic_scan(n)
+    bg = XRDBackground()
+    return lambda: bg.baseline_snip(y)
+
+
+@benchmark("baseline.baseline_snip_batch", rows=[10, 100], n=[10_000])
+def snip_batch(rows, n):
+    # 多条共享横坐标的扫描作为二维数组一次计算
+    x, y = synthetic_scan(n)
+    Y = np.tile(y, (rows, 1))
+    snip = _uncached("baseline_snip")
+    bg = XRDBackground()
+    return lambda: snip(bg, Y)
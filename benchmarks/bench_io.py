@@ -0,0 +1,50 @@
+# 样例数据文件的读取耗时
+import tempfile
+
+import numpy as np
+from harness import ROOT, benchmark
+
+from app.services.data_io import DataIO
+from app.services.scan_cache import ScanCache
+from app.services.text_parser import (SNIFF_SIZE, SUPPORTED_SUFFIXES,
+                                      read_table, sniff_format)
+
+DATA_DIR = ROOT / "data"
+SAMPLE_FILES = sorted(p.name for p in DATA_DIR.iterdir()
+                      if p.suffix.lower() in SUPPORTED_SUFFIXES)
+
+
+@benchmark("io.read_table", file=SAMPLE_FILES)
+def read_table_(file):
+    path = DATA_DIR / file
+    return lambda: read_table(path)
+
+
+@benchmark("io.loadtxt", file=SAMPLE_FILES)
+def loadtxt(file):
+    # 参照：格式已知时直接调用 np.loadtxt，read_table 应与之持平
+    path = DATA_DIR / file
+    with open(path, encoding="latin-1") as f:
+        fmt = sniff_format(f.readlines(SNIFF_SIZE))
+    return lambda: np.loadtxt(path, delimiter=fmt.delimiter,
+                              skiprows=fmt.header_lines, ndmin=2,
+                              encoding="latin-1")
+
+
+@benchmark("io.read_file", file=SAMPLE_FILES)
+def read_file(file):
+    # 不使用缓存：每次都解析文本
+    io = DataIO(use_cache=False)
+    path = DATA_DIR / file
+    return lambda: io.read_file(path)
+
+
+@benchmark("io.read_file_cached", file=SAMPLE_FILES)
+def read_file_cached(file):
+    # 二进制缓存已建立：内存映射读取
+    tmp = tempfile.TemporaryDirectory()
+    io = DataIO(use_cache=False)
+    io.cache = ScanCache(tmp.name)
+    path = DATA_DIR / file
+    io.read_file(path)
+    return (lambda: io.read_file(path)), tmp.cleanup
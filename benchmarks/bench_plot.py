@@ -0,0 +1,76 @@
+# PlotCanvas 在不同曲线数下的重绘耗时
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+from datasets import synthetic_stack
+from harness import benchmark
+
+from app.models.curve import Curve
+from app.models.file import File
+from app.services.data_center import data_center
+from app.views.plot_canvas import PlotCanvas
+
+N_CURVES = [1, 10, 100, 1000]
+N_POINTS = 10_000
+
+
+def _clear():
+    center = data_center()
+    center.begin_batch()
+    for file_id in list(center.files):
+        center.remove_file(file_id)
+    center.end_batch()
+
+
+def _populate(n_curves: int, n_points: int = N_POINTS):
+    """
+    清空数据中心，放入一个共享横坐标的 n_curves 列文件。
+    """
+    _clear()
+    center = data_center()
+    center.begin_batch()
+    x, Y = synthetic_stack(n_curves, n_points)
+    file = File("bench.xy", data=np.vstack([x, Y]))
+    center.add_file(file)
+    for i in range(n_curves):
+        center.add_curve(Curve(file.x, file.raw_data[i + 1], file.id,
+                               f"bench [{i + 1}]"), file)
+    center.end_batch()
+
+
+def _canvas(n_curves):
+    QApplication.instance() or QApplication([])
+    _populate(n_curves)
+    canvas = PlotCanvas()
+    canvas.resize(1000, 700)
+    canvas.show()
+
+    def cleanup():
+        data_center().curvesUpdated.disconnect(canvas.on_curves_updated)
+        canvas.close()
+        canvas.deleteLater()
+        _clear()
+
+    return canvas, cleanup
+
+
+@benchmark("plot.redraw", n_curves=N_CURVES)
+def redraw(n_curves):
+    # 曲线已同步到画布，只重新渲染整张图
+    canvas, cleanup = _canvas(n_curves)
+    canvas.plot_curves()
+    canvas.canvas.draw()
+    return canvas.canvas.draw, cleanup
+
+
+@benchmark("plot.replot", n_curves=N_CURVES)
+def replot(n_curves):
+    # 清空画布后重新为所有曲线建立艺术家并渲染
+    canvas, cleanup = _canvas(n_curves)
+
+    def replot():
+        canvas.clear()
+        canvas.plot_curves()
+        canvas.canvas.draw()
+
+    return replot, cleanup
@@ -0,0 +1,26 @@
+# 基准使用的合成数据
+import numpy as np
+
+
+def synthetic_scan(n: int, seed: int = 0):
+    """
+    合成衍射图：缓变背景 + 若干高斯峰 + 泊松噪声，2θ 从 10° 到 90°。
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(10, 90, n)
+    background = 200 * np.exp(-(x - 10) / 40) + 50
+    centers = rng.uniform(15, 85, 20)
+    heights = rng.uniform(100, 2000, 20)
+    peaks = (heights[:, None]
+             * np.exp(-0.5 * ((x - centers[:, None]) / 0.08) ** 2)).sum(0)
+    y = rng.poisson(background + peaks).astype(float)
+    return x, y
+
+
+def synthetic_stack(n_curves: int, n: int, seed: int = 0):
+    """
+    n_curves 条共享横坐标的合成扫描，返回 (x, Y)。
+    """
+    x, _ = synthetic_scan(n, seed)
+    Y = np.stack([synthetic_scan(n, seed + i)[1] for i in range(n_curves)])
+    return x, Y
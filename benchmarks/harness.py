@@ -0,0 +1,193 @@
+# 基准测试框架：注册、计时、保存 JSON 和与旧结果比较
+import fnmatch
+import itertools
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+
+MIN_SAMPLE_TIME = 0.05
+DEFAULT_REPEAT = 5
+# 单次调用超过该时间的基准只重复 SLOW_REPEAT 次
+SLOW_CALL_TIME = 1.0
+SLOW_REPEAT = 3
+
+
+class Benchmark:
+    """
+    一个参数组合下的基准。
+
+    setup(**params) 在计时之外执行，返回被计时的无参函数，
+    或 (被计时的函数, 清理函数)。
+    """
+
+    def __init__(self, name: str, setup: Callable, params: dict) -> None:
+        self.name = name
+        self.setup = setup
+        self.params = params
+
+    @property
+    def full_name(self) -> str:
+        if not self.params:
+            return self.name
+        args = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{args}]"
+
+
+_registry: list[Benchmark] = []
+
+
+def benchmark(name: str, **params):
+    """
+    注册基准的装饰器。每个关键字参数给出一组取值，按笛卡尔积展开：
+
+        @benchmark("baseline.snip", n=[1000, 10000])
+        def snip(n):
+            y = ...
+            return lambda: XRDBackground().baseline_snip(y)
+    """
+    def decorator(setup):
+        keys = list(params)
+        for values in itertools.product(*(params[k] for k in keys)):
+            _registry.append(Benchmark(name, setup, dict(zip(keys, values))))
+        return setup
+    return decorator
+
+
+def registered(patterns: list[str] | None = None) -> list[Benchmark]:
+    """
+    已注册的基准，可按 fnmatch 模式（匹配 full_name）筛选。
+    """
+    if not patterns:
+        return list(_registry)
+    return [b for b in _registry
+            if any(fnmatch.fnmatchcase(b.full_name, p) for p in patterns)]
+
+
+def time_callable(fn: Callable, repeat: int = DEFAULT_REPEAT,
+                  min_time: float = MIN_SAMPLE_TIME) -> dict:
+    """
+    先预热调用一次（导入、建进程池等一次性开销），再按 timeit 的方式计时：
+    每个样本连续调用 number 次，number 取使样本时间不少于 min_time 的最小值。
+
+    :return: dict：number、repeat、samples（每次调用的秒数）、
+             min、median、stdev
+    """
+    fn()
+    start = time.perf_counter()
+    fn()
+    once = time.perf_counter() - start
+
+    number = max(1, int(min_time / once)) if once > 0 else 1000
+    if once > SLOW_CALL_TIME:
+        repeat = min(repeat, SLOW_REPEAT)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "samples": samples,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def run(benchmarks: list[Benchmark], repeat: int = DEFAULT_REPEAT,
+        min_time: float = MIN_SAMPLE_TIME, verbose: bool = True) -> dict:
+    """
+    依次运行基准，失败的基准记录 error 而不中断。
+
+    :return: dict，full_name 到计时结果（另含 name 和 params）
+    """
+    results = {}
+    for bench in benchmarks:
+        cleanup = None
+        try:
+            fn = bench.setup(**bench.params)
+            if isinstance(fn, tuple):
+                fn, cleanup = fn
+            result = time_callable(fn, repeat, min_time)
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            if cleanup is not None:
+                cleanup()
+        result = {"name": bench.name, "params": bench.params, **result}
+        results[bench.full_name] = result
+        if verbose:
+            print(format_result(bench.full_name, result), flush=True)
+    return results
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def format_result(name: str, result: dict) -> str:
+    if "error" in result:
+        return f"{name:<60} ERROR {result['error']}"
+    return (f"{name:<60} {format_time(result['median']):>10} "
+            f"± {format_time(result['stdev']):<10} "
+            f"({result['repeat']}×{result['number']})")
+
+
+def environment() -> dict:
+    """
+    记录与结果可比性相关的环境信息。
+    """
+    info = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    for package in ("numpy", "scipy", "matplotlib", "PySide6", "fastapi"):
+        try:
+            info[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            info[package] = None
+    try:
+        info["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return info
+
+
+def compare(old: dict, new: dict, threshold: float = 1.2) -> list[tuple]:
+    """
+    比较两次运行中共有基准的中位数时间。
+
+    :param threshold: 新旧时间之比超过该值视为变慢，低于其倒数视为变快
+    :return: [(full_name, 旧时间, 新时间, 比值, 状态)]，状态为
+             "slower"、"faster" 或 ""
+    """
+    rows = []
+    for name, result in new.items():
+        before = old.get(name)
+        if before is None or "median" not in before or "median" not in result:
+            continue
+        ratio = result["median"] / before["median"]
+        status = "slower" if ratio > threshold else \
+            "faster" if ratio < 1 / threshold else ""
+        rows.append((name, before["median"], result["median"], ratio, status))
+    return rows
@@ -0,0 +1,93 @@
+# 运行基准测试，结果保存为 JSON，可与之前的结果比较
+#
+#   python benchmarks/run.py                          # 全部基准
+#   python benchmarks/run.py baseline io              # 只运行部分模块
+#   python benchmarks/run.py -k "baseline.*n=1000]"   # 按名称筛选
+#   python benchmarks/run.py -o new.json --compare old.json
+#
+# 启动时间见 benchmarks/startup.py。
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+SUITES = sorted(p.stem[len("bench_"):] for p in HERE.glob("bench_*.py"))
+
+
+def _prepare_environment(tmp: str):
+    """
+    让基准不依赖显示器，也不读写用户目录下的缓存和数据库。
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["OPENXRD_CACHE_DIR"] = os.path.join(tmp, "cache")
+    os.environ["OPENXRD_CATALOG"] = os.path.join(tmp, "catalog.sqlite")
+    os.environ.pop("OPENXRD_RESULT_CACHE_DIR", None)
+    sys.path[:0] = [str(HERE), str(HERE.parent)]
+
+
+def print_comparison(rows, threshold):
+    print(f"\nCompared with previous run (threshold ×{threshold}):")
+    for name, before, after, ratio, status in rows:
+        if status:
+            print(f"  {status:<7}{name:<60}{before * 1e3:10.3f} ms "
+                  f"-> {after * 1e3:10.3f} ms  ×{ratio:.2f}")
+    n_slower = sum(row[-1] == "slower" for row in rows)
+    n_faster = sum(row[-1] == "faster" for row in rows)
+    print(f"  {len(rows)} compared, {n_slower} slower, {n_faster} faster")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="运行 OpenXRD 基准测试")
+    parser.add_argument("suites", nargs="*", metavar="suite",
+                        help=f"模块：{', '.join(SUITES)}，默认全部")
+    parser.add_argument("-k", dest="patterns", action="append",
+                        help="按基准全名筛选的 fnmatch 模式，可多次指定")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="每个样本的最短时间（秒）")
+    parser.add_argument("-o", "--output", help="结果 JSON 文件")
+    parser.add_argument("--compare", help="与之前保存的结果 JSON 比较")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="比较时视为变慢的时间比")
+    parser.add_argument("--list", action="store_true", help="只列出基准")
+    args = parser.parse_args(argv)
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _prepare_environment(tmp)
+        import harness
+
+        for suite in args.suites or SUITES:
+            importlib.import_module(f"bench_{suite}")
+        benchmarks = harness.registered(args.patterns)
+        if args.list:
+            for bench in benchmarks:
+                print(bench.full_name)
+            return 0
+
+        results = harness.run(benchmarks, args.repeat, args.min_time)
+        report = {"environment": harness.environment(), "results": results}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)["results"]
+        rows = harness.compare(previous, results, args.threshold)
+        print_comparison(rows, args.threshold)
+        if any(row[-1] == "slower" for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# 启动时间基准：各入口模块的导入耗时及按包汇总的 -X importtime 明细
+#
+#   python benchmarks/startup.py                  # 默认入口模块
+#   python benchmarks/startup.py app.cli -n 10    # 指定模块和重复次数
+#   python benchmarks/startup.py --json startup.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 命令行和纯 API 进程应在 1 秒内启动；界面进程会导入 Qt 和 matplotlib
+ENTRY_MODULES = ("app.cli", "app.views.app", "app.run", "app.views.gui")
+
+
+def _run(code: str) -> tuple[float, str]:
+    """
+    在新的解释器中以 -X importtime 执行 code，返回 (墙钟时间 s, stderr)。
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return wall, proc.stderr
+
+
+def parse_importtime(text: str) -> list[dict]:
+    """
+    解析 -X importtime 的输出。
+
+    :return: 每个模块一个 dict：name、depth（嵌套层数）、self_us、cumulative_us
+    """
+    records = []
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append({"name": name.strip(), "depth": depth,
+                        "self_us": int(self_us), "cumulative_us":
+                        int(cumulative_us)})
+    return records
+
+
+def by_package(records: list[dict]) -> dict[str, int]:
+    """
+    按顶层包汇总自身导入时间（微秒），降序。
+    """
+    totals: dict[str, int] = {}
+    for r in records:
+        package = r["name"].split(".")[0]
+        totals[package] = totals.get(package, 0) + r["self_us"]
+    return dict(sorted(totals.items(), key=lambda kv: -kv[1]))
+
+
+def measure(module: str, repeat: int = 5) -> dict:
+    """
+    重复导入 module，取墙钟时间的中位数对应的一次作为明细。
+
+    :return: dict：module、wall_s（每次的进程墙钟时间）、import_s（中位数次
+             module 的累计导入时间）、packages（按包汇总，秒）、
+             slowest（累计时间最长的模块）
+    """
+    runs = [_run(f"import {module}") for _ in range(repeat)]
+    walls = [wall for wall, _ in runs]
+    median = sorted(range(repeat), key=lambda i: walls[i])[repeat // 2]
+    records = parse_importtime(runs[median][1])
+    target = next(r for r in reversed(records) if r["name"] == module)
+    slowest = sorted(records, key=lambda r: -r["cumulative_us"])[1:11]
+    return {
+        "module": module,
+        "wall_s": walls,
+        "import_s": target["cumulative_us"] / 1e6,
+        "packages": {k: v / 1e6 for k, v in by_package(records).items()},
+        "slowest": [{"name": r["name"], "cumulative_s":
+                     r["cumulative_us"] / 1e6} for r in slowest],
+    }
+
+
+def report(results: list[dict], interpreter_s: float, top: int = 8):
+    print(f"Interpreter startup (python -c pass): {interpreter_s:.3f} s\n")
+    for res in results:
+        print(f"{res['module']}: import {res['import_s']:.3f} s, "
+              f"process {statistics.median(res['wall_s']):.3f} s "
+              f"(median of {len(res['wall_s'])})")
+        for package, seconds in list(res["packages"].items())[:top]:
+            print(f"    {package:<28}{seconds:8.3f} s")
+        print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测量各入口模块的导入时间")
+    parser.add_argument("modules", nargs="*", default=ENTRY_MODULES)
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8,
+                        help="每个模块列出的包数")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    interpreter_s = statistics.median(
+        _run("pass")[0] for _ in range(args.repeat))
+    results = []
+    for module in args.modules:
+        try:
+            results.append(measure(module, args.repeat))
+        except RuntimeError as e:
+            print(f"{module}: failed to import ({e})", file=sys.stderr)
+    report(results, interpreter_s, args.top)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0],
+                       "interpreter_s": interpreter_s,
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# 在导入 app 之前把缓存和目录数据库指向临时目录，测试不触碰用户的 ~/.openxrd
+_TMP = tempfile.mkdtemp(prefix="openxrd-tests-")
+os.environ.setdefault("OPENXRD_CACHE_DIR", os.path.join(_TMP, "cache"))
+os.environ.setdefault("OPENXRD_CATALOG", os.path.join(_TMP, "catalog.sqlite"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+@pytest.fixture
+def data_files():
+    return sorted(DATA_DIR.iterdir())
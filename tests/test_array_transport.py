@@ -0,0 +1,35 @@
+import numpy as np
+
+from app.services.array_transport import (decode_arrays, encode_arrays,
+                                          encode_frame, iter_frames)
+
+
+def test_round_trip():
+    data = np.random.default_rng(0).normal(size=(3, 101))
+    meta = {"source": "scan.xy", "n": 3}
+    decoded, decoded_meta = decode_arrays(encode_arrays(data, meta))
+    np.testing.assert_array_equal(decoded, data)
+    assert decoded_meta == meta
+    assert not decoded.flags.writeable
+
+
+def test_payload_is_aligned():
+    for name in ("a", "ab", "abc", "abcdefg"):
+        body = encode_arrays(np.ones((2, 5)), {"source": name})
+        assert (len(body) - 2 * 5 * 8) % 8 == 0
+
+
+def test_non_contiguous_and_integer_input():
+    data = np.arange(20).reshape(4, 5)[:, ::2]
+    decoded, meta = decode_arrays(encode_arrays(data))
+    np.testing.assert_array_equal(decoded, data)
+    assert decoded.dtype == np.float64 and meta == {}
+
+
+def test_frames():
+    arrays = [np.ones((2, 3)), np.zeros((0,)), np.arange(8.0).reshape(2, 4)]
+    body = b"".join(encode_frame(a, {"i": i}) for i, a in enumerate(arrays))
+    frames = list(iter_frames(body))
+    assert [meta["i"] for _, meta in frames] == [0, 1, 2]
+    for (decoded, _), expected in zip(frames, arrays):
+        np.testing.assert_array_equal(decoded, expected)
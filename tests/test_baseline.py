@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from app.core.baseline import XRDBackground, _second_diff_penalty_band
+
+
+def _als_reference(y, lam, p, niter, strict):
+    """用稀疏矩阵和 spsolve 的直接实现作为参照。"""
+    from scipy import sparse
+    from scipy.sparse.linalg import spsolve
+
+    n = len(y)
+    D = sparse.diags([1.0, -2.0, 1.0], [0, 1, 2], shape=(n - 2, n))
+    penalty = lam * (D.T @ D)
+    w = np.ones(n)
+    for _ in range(niter):
+        z = spsolve(sparse.csc_matrix(sparse.diags(w) + penalty), w * y)
+        if strict:
+            w_new = p * (y > z) + (1 - p) * (y < z)
+        else:
+            w_new = np.where(y > z, p, 1 - p)
+        if np.array_equal(w_new, w):
+            break
+        w = w_new
+    return z
+
+
+@pytest.fixture
+def scan():
+    rng = np.random.default_rng(0)
+    x = np.linspace(10, 80, 1500)
+    y = (200 + 2 * x + 500 * np.exp(-((x - 30) / 0.2) ** 2)
+         + 300 * np.exp(-((x - 55) / 0.3) ** 2) + rng.normal(0, 5, x.size))
+    return x, y
+
+
+def test_penalty_band_matches_dense():
+    n, lam = 7, 3.0
+    D = np.diff(np.eye(n), 2, axis=0)
+    dense = lam * D.T @ D
+    ab = _second_diff_penalty_band(n, lam)
+    for k in range(3):
+        np.testing.assert_allclose(ab[2 - k, k:], np.diag(dense, k))
+
+
+@pytest.mark.parametrize("lam, p", [(1e5, 0.01), (1e3, 0.05)])
+def test_baseline_als_matches_spsolve(scan, lam, p):
+    _, y = scan
+    z = XRDBackground().baseline_als(y, lam=lam, p=p, niter=10)
+    np.testing.assert_allclose(z, _als_reference(y, lam, p, 10, False),
+                               rtol=0, atol=1e-6)
+
+
+def test_asls_baseline_matches_spsolve(scan):
+    _, y = scan
+    z = XRDBackground().asls_baseline(y, lam=1e6, p=0.01, niter=10)
+    np.testing.assert_allclose(z, _als_reference(y, 1e6, 0.01, 10, True),
+                               rtol=0, atol=1e-6)
+
+
+def test_batch_matches_single_scans(scan):
+    x, y = scan
+    Y = np.stack([y, 0.5 * y + 10, y[::-1]])
+    bg = XRDBackground()
+    batch = bg.baseline_batch(x, Y, "als", lam=1e5, p=0.01)
+    for row, expected in zip(batch, Y):
+        np.testing.assert_allclose(
+            row, bg.baseline_als(expected, lam=1e5, p=0.01), atol=1e-6)
+
+
+def test_short_signal_rejected():
+    with pytest.raises(ValueError):
+        _second_diff_penalty_band(2, 1.0)
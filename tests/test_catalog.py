@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.models.curve import Curve
+from app.models.file import File
+from app.services.catalog import Catalog
+
+
+def _file(name, n_curves=1):
+    x = np.linspace(10, 80, 100)
+    file = File(name, data=np.vstack([x] + [x * (i + 1)
+                                            for i in range(n_curves)]))
+    for i in range(n_curves):
+        file.add_curve(Curve(file.x, file.raw_data[i + 1], file.id, name))
+    return file
+
+
+def _peaks(file, two_theta):
+    curve_ids = [next(iter(file.curves))] * len(two_theta)
+    two_theta = np.asarray(two_theta, dtype=float)
+    return {"curve_id": np.array(curve_ids, dtype=object),
+            "two_theta": two_theta, "d_spacing": 1 / two_theta,
+            "height": np.ones(len(two_theta)),
+            "width": np.full(len(two_theta), 0.1)}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = Catalog(tmp_path / "catalog.sqlite")
+    yield catalog
+    catalog.close()
+
+
+@pytest.fixture
+def files(catalog):
+    files = {}
+    for day, sample in enumerate(("quartz_1", "quartzA1", "q%z", "LaB6"),
+                                 start=1):
+        file = _file(f"{sample}.xy")
+        catalog.add_file(file, sample=sample,
+                         acquired=datetime(2024, 1, day, 12))
+        files[sample] = file
+    return files
+
+
+def _samples(rows):
+    return sorted(row["sample"] for row in rows)
+
+
+def test_find_files_exact_by_default(catalog, files):
+    assert _samples(catalog.find_files("quartz_1")) == ["quartz_1"]
+    assert _samples(catalog.find_files("q%z")) == ["q%z"]
+    assert catalog.find_files("quartz") == []
+
+
+def test_find_files_pattern(catalog, files):
+    assert _samples(catalog.find_files("quartz_1", pattern=True)) == \
+        ["quartzA1", "quartz_1"]
+    assert _samples(catalog.find_files(r"quartz\_1", pattern=True)) == \
+        ["quartz_1"]
+    assert _samples(catalog.find_files("q%", pattern=True)) == \
+        ["q%z", "quartzA1", "quartz_1"]
+    assert _samples(catalog.find_files(r"q\%z", pattern=True)) == ["q%z"]
+
+
+def test_find_files_by_acquisition_time(catalog, files):
+    rows = catalog.find_files(acquired_from="2024-01-02",
+                              acquired_to="2024-01-03T23:59:59")
+    assert [row["sample"] for row in rows] == ["quartzA1", "q%z"]
+    assert len(catalog.find_files(limit=2)) == 2
+
+
+def test_find_peaks_in_range(catalog, files):
+    catalog.add_peaks(_peaks(files["quartz_1"], [20.8, 26.6, 50.1]))
+    catalog.add_peaks(_peaks(files["LaB6"], [21.3, 30.4]))
+
+    rows = catalog.find_peaks(21.0, 30.5)
+    assert [row["two_theta"] for row in rows] == [21.3, 26.6, 30.4]
+    assert [row["sample"] for row in rows] == ["LaB6", "quartz_1", "LaB6"]
+    assert rows[1]["file_id"] == files["quartz_1"].id
+    assert rows[1]["curve_id"] == next(iter(files["quartz_1"].curves))
+    assert catalog.find_peaks(60, 70) == []
+
+
+def test_curve_peaks_and_replace(catalog, files):
+    file = files["LaB6"]
+    curve_id = next(iter(file.curves))
+    catalog.add_peaks(_peaks(file, [30.4, 21.3]))
+    assert [p["two_theta"] for p in catalog.curve_peaks(curve_id)] == \
+        [21.3, 30.4]
+    catalog.add_peaks(_peaks(file, [37.4]), replace=True)
+    assert [p["two_theta"] for p in catalog.curve_peaks(curve_id)] == [37.4]
+
+
+def test_re_adding_file_keeps_peaks(catalog, files):
+    file = files["LaB6"]
+    catalog.add_peaks(_peaks(file, [21.3]))
+    catalog.add_file(file, sample="LaB6 renamed")
+    assert len(catalog.curve_peaks(next(iter(file.curves)))) == 1
+    assert _samples(catalog.find_files("LaB6 renamed")) == ["LaB6 renamed"]
+
+
+def test_remove_file_removes_peaks(catalog, files):
+    catalog.add_peaks(_peaks(files["LaB6"], [21.3]))
+    catalog.remove_file(files["LaB6"].id)
+    assert not catalog.has_file(files["LaB6"].id)
+    assert catalog.find_peaks(0, 90) == []
+
+
+def test_peaks_for_unknown_curve(catalog):
+    with pytest.raises(KeyError):
+        catalog.add_peaks(_peaks(_file("missing.xy"), [20.0]))
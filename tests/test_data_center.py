@@ -0,0 +1,76 @@
+import numpy as np
+
+from app.models.curve import Curve
+from app.models.file import File
+from app.services.data_center import CurveField, DataCenter, Delta
+
+
+def test_add_then_remove_cancels():
+    delta = Delta()
+    delta.add("a")
+    delta.change("a", {CurveField.DATA})
+    delta.remove("a")
+    assert not delta
+
+
+def test_change_then_remove_is_removal():
+    delta = Delta()
+    delta.change("a", {CurveField.STYLE})
+    delta.remove("a")
+    assert delta.removed == {"a"} and not delta.changed
+
+
+def test_remove_then_add_is_full_change():
+    delta = Delta()
+    delta.remove("a")
+    delta.add("a")
+    assert delta.changed == {"a": set(CurveField.ALL)}
+    assert not delta.added and not delta.removed
+
+
+def test_merge_accumulates_fields():
+    first = Delta(added={"a"}, changed={"b": {CurveField.DATA}})
+    second = Delta(changed={"a": {CurveField.STYLE},
+                            "b": {CurveField.BASELINE}},
+                   removed={"c"})
+    first.merge(second)
+    assert first.added == {"a"}
+    assert first.changed == {"b": {CurveField.DATA, CurveField.BASELINE}}
+    assert first.removed == {"c"}
+    assert first.ids() == {"a", "b"}
+
+
+def test_batch_emits_one_merged_delta():
+    center = DataCenter()
+    received = []
+    center.curvesUpdated.connect(received.append)
+    x = np.linspace(10, 80, 10)
+    file = File("a.xy", data=np.vstack([x, x, x]))
+
+    center.begin_batch()
+    center.add_file(file)
+    curves = [Curve(file.x, file.raw_data[i], file.id, str(i))
+              for i in (1, 2)]
+    for curve in curves:
+        center.add_curve(curve, file)
+    center.update_curve(curves[0], {CurveField.BASELINE})
+    center.remove_curve(curves[1].id)
+    assert received == []
+    center.end_batch()
+
+    assert len(received) == 1
+    assert received[0].added == {curves[0].id}
+    assert not received[0].changed and not received[0].removed
+
+
+def test_remove_file_removes_its_curves():
+    center = DataCenter()
+    x = np.linspace(10, 80, 10)
+    file = File("a.xy", data=np.vstack([x, x]))
+    center.add_file(file)
+    center.add_curve(Curve(file.x, file.raw_data[1], file.id, "a"), file)
+    received = []
+    center.curvesUpdated.connect(received.append)
+    center.remove_file(file.id)
+    assert not center.curves and not center.files
+    assert len(received) == 1 and len(received[0].removed) == 1
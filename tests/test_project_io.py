@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from app.models.curve import Curve, is_mapped
+from app.models.file import File
+from app.services.data_center import DataCenter
+from app.services.project_io import load_project, save_project
+
+
+def _add_file(center, name, n_curves, n_points=200):
+    x = np.linspace(10, 80, n_points)
+    data = np.vstack([x] + [np.sin(x * (i + 1)) + i
+                            for i in range(n_curves)])
+    file = File(name, data=data)
+    file.raw_x_type = "2theta"
+    file.wavelength = 1.5406
+    center.add_file(file)
+    for i in range(n_curves):
+        center.add_curve(Curve(file.x, file.raw_data[i + 1], file.id,
+                               f"{name} [{i + 1}]"), file)
+    return file
+
+
+@pytest.fixture
+def center():
+    center = DataCenter()
+    _add_file(center, "a.xy", 1)
+    b = _add_file(center, "b.xy", 3)
+    # 处理过的曲线：显示数据不再是原始数据的视图，另有背景
+    curve = next(iter(b.curves.values()))
+    curve.displayed_x = curve.raw_x[10:-10].copy()
+    curve.displayed_y = curve.raw_y[10:-10] * 2
+    curve.baseline = np.full(len(curve.displayed_y), 0.5)
+    curve.style = {"color": "red"}
+    center.params = {"baseline": "als", "lam": 1e5}
+    center.peak_tables["all"] = {
+        "curve_id": np.array([curve.id, curve.id], dtype=object),
+        "two_theta": np.array([20.0, 30.0]),
+        "height": np.array([1.0, 2.0]),
+    }
+    return center
+
+
+def _snapshot(center):
+    return {cid: (c.label, c.file_id, c.style, np.array(c.raw_y),
+                  np.array(c.displayed_x), np.array(c.displayed_y),
+                  None if c.baseline is None else np.array(c.baseline))
+            for cid, c in center.curves.items()}
+
+
+def test_save_load_round_trip(center, tmp_path):
+    path = tmp_path / "project.oxrd"
+    expected = _snapshot(center)
+    files = {fid: (str(f.filepath), f.wavelength, f.raw_x_type,
+                   np.array(f.raw_data)) for fid, f in center.files.items()}
+    save_project(path, center)
+
+    loaded = DataCenter()
+    load_project(path, loaded)
+    actual = _snapshot(loaded)
+    assert actual.keys() == expected.keys()
+    for cid, values in expected.items():
+        for a, b in zip(actual[cid], values):
+            if isinstance(b, np.ndarray):
+                np.testing.assert_array_equal(a, b)
+            else:
+                assert a == b
+    assert {fid: (str(f.filepath), f.wavelength, f.raw_x_type)
+            for fid, f in loaded.files.items()} == \
+        {fid: v[:3] for fid, v in files.items()}
+    for fid, f in loaded.files.items():
+        np.testing.assert_array_equal(f.raw_data, files[fid][3])
+    assert loaded.params == center.params
+    table = loaded.peak_tables["all"]
+    np.testing.assert_array_equal(table["two_theta"], [20.0, 30.0])
+    assert list(table["curve_id"]) == list(
+        center.peak_tables["all"]["curve_id"])
+
+
+def test_load_maps_arrays_lazily(center, tmp_path):
+    path = tmp_path / "project.oxrd"
+    save_project(path, center)
+    loaded = DataCenter()
+    load_project(path, loaded)
+    file = next(iter(loaded.files.values()))
+    assert is_mapped(file.raw_data)
+    curve = next(iter(file.curves.values()))
+    # 未处理的曲线仍是文件数据的视图，共享的横坐标只保存一份
+    assert curve.raw_x is file.x or np.shares_memory(curve.raw_x, file.x)
+
+
+def test_load_replaces_current_contents(center, tmp_path):
+    path = tmp_path / "project.oxrd"
+    save_project(path, center)
+    other = DataCenter()
+    _add_file(other, "stale.xy", 2)
+    load_project(path, other)
+    assert set(other.curves) == set(center.curves)
+    assert set(other.files) == set(center.files)
@@ -0,0 +1,57 @@
+import io
+
+import numpy as np
+import pytest
+
+from app.services.text_parser import iter_blocks, read_table, sniff_format
+
+
+def test_read_table_matches_loadtxt(data_files):
+    for path in data_files:
+        expected = np.loadtxt(path, ndmin=2, encoding="latin-1")
+        np.testing.assert_array_equal(read_table(path), expected)
+        np.testing.assert_array_equal(read_table(str(path)), expected)
+
+
+def test_read_table_from_bytes_and_file_object(data_files):
+    path = data_files[0]
+    expected = np.loadtxt(path, ndmin=2, encoding="latin-1")
+    content = path.read_bytes()
+    np.testing.assert_array_equal(read_table(content), expected)
+    np.testing.assert_array_equal(read_table(io.BytesIO(content)), expected)
+
+
+def test_small_blocks_give_same_table(data_files):
+    path = data_files[-1]
+    blocks = list(iter_blocks(path, block_size=4096))
+    assert len(blocks) > 1
+    np.testing.assert_array_equal(np.concatenate(blocks), read_table(path))
+
+
+@pytest.mark.parametrize("delimiter", [",", ";", "\t"])
+def test_header_and_delimiter_are_detected(tmp_path, delimiter):
+    data = np.column_stack([np.linspace(5, 90, 50), np.arange(50.0)])
+    path = tmp_path / "scan.csv"
+    lines = ["Sample: test", f"2theta{delimiter}counts"]
+    lines += [delimiter.join(repr(float(v)) for v in row) for row in data]
+    path.write_text("\n".join(lines) + "\n")
+
+    fmt = sniff_format(lines)
+    assert fmt.header_lines == 2
+    np.testing.assert_array_equal(read_table(path), data)
+    np.testing.assert_array_equal(
+        read_table(path), np.loadtxt(path, delimiter=delimiter, skiprows=2))
+
+
+def test_other_comment_prefixes_are_skipped(tmp_path):
+    path = tmp_path / "scan.xy"
+    path.write_text("1 2\n! note\n3 4\n// note\n5 6\n")
+    np.testing.assert_array_equal(read_table(path),
+                                  [[1, 2], [3, 4], [5, 6]])
+
+
+def test_no_numeric_data(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("no numbers here\n")
+    with pytest.raises(ValueError):
+        read_table(path)